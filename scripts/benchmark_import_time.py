@@ -0,0 +1,85 @@
+# /// script
+# requires-python = ">=3.12,<3.13"
+# dependencies = ["mechaphlowers == 0.4.3"]
+# ///
+"""
+Measure the time to run functions.py in a fresh interpreter, which is what the
+python worker reports as importTime before any task can run. Each run starts a
+new process so that no module is already imported.
+
+With --compare, the same measure is done on functions.py at a git revision,
+e.g. --compare HEAD~1 to see what the last commit changed.
+"""
+
+import argparse
+import statistics
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+FUNCTIONS_PATH = "src/app/core/services/worker_python/tasks/python-scripts/functions.py"
+
+MEASURE = """
+import contextlib, io, runpy, sys, time
+start = time.perf_counter()
+with contextlib.redirect_stdout(io.StringIO()):
+    runpy.run_path(sys.argv[1])
+print(time.perf_counter() - start)
+"""
+
+
+def measure(path: str, runs: int) -> list[float]:
+    times = []
+    for _ in range(runs):
+        output = subprocess.run(
+            [sys.executable, "-c", MEASURE, path],
+            check=True,
+            capture_output=True,
+            text=True,
+        ).stdout
+        times.append(float(output.splitlines()[-1]))
+    return times
+
+
+def print_times(label: str, times: list[float]):
+    print(
+        f"{label:>24}: median {statistics.median(times) * 1000:7.1f} ms, "
+        f"min {min(times) * 1000:7.1f} ms over {len(times)} runs"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--runs", type=int, default=20)
+    parser.add_argument("--compare", help="git revision to compare with")
+    args = parser.parse_args()
+
+    times = measure(FUNCTIONS_PATH, args.runs)
+    print_times("functions.py", times)
+    if not args.compare:
+        return
+
+    source = subprocess.run(
+        ["git", "show", f"{args.compare}:{FUNCTIONS_PATH}"],
+        check=True,
+        capture_output=True,
+        text=True,
+    ).stdout
+    with tempfile.TemporaryDirectory() as directory:
+        path = Path(directory) / "functions.py"
+        path.write_text(source)
+        compared_times = measure(str(path), args.runs)
+    print_times(f"functions.py@{args.compare}", compared_times)
+    difference = statistics.median(compared_times) - statistics.median(times)
+    print(
+        f"{'difference':>24}: {abs(difference) * 1000:7.1f} ms "
+        f"({abs(difference) / statistics.median(compared_times):.0%}"
+        f" {'faster' if difference > 0 else 'slower'})"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+# /// script
+# requires-python = ">=3.12,<3.13"
+# dependencies = ["mechaphlowers == 0.4.3"]
+# ///
+"""
+Compare split_points_into_their_spans of the python worker with the previous
+pure python loop, on NaN separated span points like mechaphlowers outputs.
+"""
+
+import argparse
+import math
+import runpy
+import timeit
+
+import numpy as np
+
+FUNCTIONS_PATH = (
+    "./src/app/core/services/worker_python/tasks/python-scripts/functions.py"
+)
+
+
+def loop_split_points_into_their_spans(data):
+    # implementation replaced by the numpy one, kept as the reference
+    spans = []
+    new_span = []
+    for row in data:
+        if math.isnan(row[0]) and math.isnan(row[1]) and math.isnan(row[2]):
+            spans.append(new_span)
+            new_span = []
+        else:
+            new_span.append(row)
+    return spans
+
+
+def generate_points(span_count: int, points_per_span: int) -> np.ndarray:
+    rng = np.random.default_rng(0)
+    points = rng.uniform(0, 500, (span_count, points_per_span + 1, 3))
+    points[:, -1] = np.nan
+    return points.reshape(-1, 3)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--spans", type=int, nargs="+", default=[10, 50, 150, 500])
+    parser.add_argument("--points-per-span", type=int, default=100)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    functions = runpy.run_path(FUNCTIONS_PATH)
+    split_points_into_their_spans = functions["split_points_into_their_spans"]
+
+    # the loop is timed on nested lists, and on the numpy array mechaphlowers returns
+    print(
+        f"{'points':>8} {'loop lists (ms)':>16} {'loop array (ms)':>16} "
+        f"{'numpy (ms)':>11} {'speedup':>8}"
+    )
+    for span_count in args.spans:
+        points = generate_points(span_count, args.points_per_span)
+        rows = points.tolist()
+        expected = loop_split_points_into_their_spans(rows)
+        spans = split_points_into_their_spans(points)
+        assert len(spans) == len(expected)
+        assert all(np.array_equal(a, b) for a, b in zip(spans, expected))
+
+        loop_time = min(
+            timeit.repeat(
+                lambda: loop_split_points_into_their_spans(rows),
+                number=1,
+                repeat=args.repeat,
+            )
+        )
+        loop_array_time = min(
+            timeit.repeat(
+                lambda: loop_split_points_into_their_spans(points),
+                number=1,
+                repeat=args.repeat,
+            )
+        )
+        numpy_time = min(
+            timeit.repeat(
+                lambda: split_points_into_their_spans(points),
+                number=1,
+                repeat=args.repeat,
+            )
+        )
+        print(
+            f"{points.shape[0]:>8} {loop_time * 1000:>16.2f} "
+            f"{loop_array_time * 1000:>16.2f} {numpy_time * 1000:>11.2f} "
+            f"{loop_time / numpy_time:>7.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
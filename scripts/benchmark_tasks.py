@@ -0,0 +1,210 @@
+# /// script
+# requires-python = ">=3.12,<3.13"
+# dependencies = ["mechaphlowers == 0.4.3"]
+# ///
+"""
+Benchmark the python worker tasks under CPython on synthetic sections.
+
+For each section size, init_section, change_climate_load, refresh_projection
+and get_support_coordinates are timed (median and p95) and their peak memory is
+measured with tracemalloc on a warm-up call. Results can be saved as a baseline
+and compared against one: the script exits with 1 when a task gets slower or
+takes more memory than the baseline plus the tolerance. Differences below
+MIN_REGRESSION (1 ms, 64 KiB) are ignored, they are noise on the small sections.
+Timings depend on the machine: save the baseline again with --save-baseline on
+the machine that runs the comparison, the committed one is only an example.
+
+A cold init_section grows quadratically with the support count (about two
+minutes for 1000 supports), use --sizes 10 100 for a quick run.
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import runpy
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+import numpy as np
+
+from generate_sections import CABLES, generate_section
+
+FUNCTIONS_PATH = (
+    "./src/app/core/services/worker_python/tasks/python-scripts/functions.py"
+)
+BASELINE_PATH = "./scripts/benchmark_tasks_baseline.json"
+
+CABLE = CABLES["ASTER 600"]
+
+# absolute increase under which a metric is not a regression, whatever the tolerance
+MIN_REGRESSION = {"median": 1e-3, "peak_memory": 64 * 2**10}
+
+# alternating climates, so each change_climate_load call solves a new state
+CLIMATES = [
+    {"windPressure": 300, "cableTemperature": 40, "iceThickness": 0},
+    {"windPressure": 0, "cableTemperature": 15, "iceThickness": 1},
+]
+
+
+def generate_support_shape(arm_count: int) -> dict:
+    # arms alternating left and right, going up the support
+    return {
+        "coordinates": [
+            [0, (-1) ** index * 5, 20 + 2 * (index // 2)] for index in range(arm_count)
+        ],
+        "attachmentSetNumbers": list(range(1, arm_count + 1)),
+    }
+
+
+def benchmark_cases(functions: dict, support_count: int) -> dict:
+    # task name -> (call, setup run before each call outside of the measure)
+    section_inputs = {"section": generate_section(support_count), "cable": CABLE}
+    climate_calls = 0
+
+    def cold_start():
+        # solved sessions are cached by init_section: start from an empty cache
+        functions["sessions"].clear()
+
+    def change_climate_load():
+        nonlocal climate_calls
+        climate_calls += 1
+        return functions["change_climate_load"](CLIMATES[climate_calls % len(CLIMATES)])
+
+    support_shape = generate_support_shape(support_count)
+    return {
+        "init_section": (
+            lambda: functions["init_section"](section_inputs),
+            cold_start,
+        ),
+        "change_climate_load": (change_climate_load, None),
+        "refresh_projection": (
+            lambda: functions["refresh_projection"](
+                {"startSupport": 0, "endSupport": support_count - 1, "view": "3d"}
+            ),
+            None,
+        ),
+        "get_support_coordinates": (
+            lambda: functions["get_support_coordinates"](support_shape),
+            None,
+        ),
+    }
+
+
+def run_case(call, setup, repeat: int, budget: float) -> dict:
+    # the warm-up call measures the peak memory, tracemalloc slows down the timed ones
+    if setup:
+        setup()
+    tracemalloc.start()
+    result = call()
+    peak_memory = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    if isinstance(result, dict) and "error" in result:
+        raise RuntimeError(result["error"])
+
+    times = []
+    start = time.perf_counter()
+    while len(times) < repeat and (not times or time.perf_counter() - start < budget):
+        if setup:
+            setup()
+        call_start = time.perf_counter()
+        call()
+        times.append(time.perf_counter() - call_start)
+    return {
+        "median": float(np.median(times)),
+        "p95": float(np.percentile(times, 95)),
+        "runs": len(times),
+        "peak_memory": peak_memory,
+    }
+
+
+def compare(results: dict, baseline: dict, tolerance: float) -> list[str]:
+    regressions = []
+    for case, result in results.items():
+        reference = baseline.get(case)
+        if reference is None:
+            continue
+        for metric in ("median", "peak_memory"):
+            increase = result[metric] - reference[metric]
+            if (
+                increase > reference[metric] * tolerance
+                and increase > MIN_REGRESSION[metric]
+            ):
+                regressions.append(
+                    f"{case} {metric}: {result[metric]:.6g} > {reference[metric]:.6g}"
+                    f" (+{result[metric] / reference[metric] - 1:.0%})"
+                )
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 100, 1000])
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument(
+        "--budget",
+        type=float,
+        default=20,
+        help="seconds after which a task stops being repeated, at least one run",
+    )
+    parser.add_argument("--baseline", default=BASELINE_PATH)
+    parser.add_argument(
+        "--save-baseline",
+        action="store_true",
+        help="write the results to the baseline instead of comparing them",
+    )
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=0.25,
+        help="relative increase of median time or peak memory allowed",
+    )
+    args = parser.parse_args()
+
+    # the tasks print their inputs for the browser console
+    with contextlib.redirect_stdout(io.StringIO()):
+        functions = runpy.run_path(FUNCTIONS_PATH)
+        # as the worker snapshot does, the first case does not pay for it
+        functions["warm_up"]()
+
+    print(
+        f"{'task':>24} {'supports':>8} {'median (ms)':>12} {'p95 (ms)':>10} "
+        f"{'runs':>5} {'peak (MiB)':>11}"
+    )
+    results = {}
+    for support_count in args.sizes:
+        cases = benchmark_cases(functions, support_count)
+        for name, (call, setup) in cases.items():
+            with contextlib.redirect_stdout(io.StringIO()):
+                result = run_case(call, setup, args.repeat, args.budget)
+            results[f"{name}/{support_count}"] = result
+            print(
+                f"{name:>24} {support_count:>8} {result['median'] * 1000:>12.1f} "
+                f"{result['p95'] * 1000:>10.1f} {result['runs']:>5} "
+                f"{result['peak_memory'] / 2**20:>11.2f}"
+            )
+
+    baseline_path = Path(args.baseline)
+    if args.save_baseline:
+        baseline_path.write_text(json.dumps(results, indent=2) + "\n")
+        print(f"baseline saved to {baseline_path}")
+        return
+    if not baseline_path.exists():
+        print(f"no baseline at {baseline_path}, run with --save-baseline")
+        return
+    regressions = compare(
+        results, json.loads(baseline_path.read_text()), args.tolerance
+    )
+    for regression in regressions:
+        print(f"regression: {regression}", file=sys.stderr)
+    if regressions:
+        sys.exit(1)
+    print(f"no regression against {baseline_path} (tolerance {args.tolerance:.0%})")
+
+
+if __name__ == "__main__":
+    main()
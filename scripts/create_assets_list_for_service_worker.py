@@ -1,16 +1,37 @@
 #!/usr/bin/env python3
+# /// script
+# requires-python = ">=3.12"
+# dependencies = ["brotli == 1.1.0"]
+# ///
 """
 Script to recursively list all files in the dist/phlowers-stellar-app directory and create a JSON file with the list of files.
 The JSON file is used to create the asset list for the service worker to precache.
+The Pyodide snapshot is only listed when snapshot.json matches the pinned pyodide version and functions.py, as the worker checks it.
+The sha256 and size of each file are written with it: the service worker only downloads the files whose sha256 changed.
+With --diff, the files that changed since a previous assets list are written to assets_diff.json.
+Gzip and brotli variants are written next to the files they are smaller than, for nginx gzip_static / brotli_static.
 """
 
+import argparse
+import gzip
+import hashlib
 import subprocess
 import os
 import sys
 import json
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from datetime import datetime, tzinfo, timedelta
 from pathlib import Path
 
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# smaller files do not gain from compression
+MIN_COMPRESSED_SIZE = 1024
+COMPRESSED_SUFFIXES = {"gzip": ".gz", "br": ".br"}
+
 
 # https://stackoverflow.com/a/23705687/9346979 real ISO 8601 format for UTC
 class simple_utc(tzinfo):
@@ -32,8 +53,14 @@ def get_git_revision_hash() -> str:
     return subprocess.check_output(["git", "rev-parse", "HEAD"]).decode("ascii").strip()
 
 
+FUNCTIONS_PATH = "src/app/core/services/worker_python/tasks/python-scripts/functions.py"
+SNAPSHOT_METADATA_PATH = "pyodide/snapshot.json"
+SNAPSHOT_PATH = "pyodide/snapshot.bin"
+
 blacklist = [
     "service-worker.js",
+    "assets_list.json",
+    "assets_diff.json",
 ]
 
 
@@ -70,7 +97,115 @@ def list_files_recursively(directory):
     return file_list
 
 
-def main(language):
+def get_outdated_snapshot_files(directory, pyodide_version):
+    """Files of the pyodide snapshot the worker would not restore, e.g. after a
+    change of functions.py: they are not precached.
+    """
+    metadata_path = os.path.join(directory, SNAPSHOT_METADATA_PATH)
+    if not os.path.exists(metadata_path):
+        # snapshot.json is written last, a snapshot without it is not restored
+        return ["/" + SNAPSHOT_PATH]
+    with open(metadata_path) as f:
+        metadata = json.load(f)
+    with open(FUNCTIONS_PATH, "rb") as f:
+        functions_sha256 = hashlib.sha256(f.read()).hexdigest()
+    snapshot_file = os.path.join(
+        os.path.dirname(SNAPSHOT_METADATA_PATH), metadata["file"]
+    )
+    if (
+        metadata["pyodideVersion"] == pyodide_version
+        and metadata["functionsSha256"] == functions_sha256
+        and os.path.exists(os.path.join(directory, snapshot_file))
+    ):
+        return []
+    print("Pyodide snapshot is outdated, it is not precached")
+    return ["/" + SNAPSHOT_METADATA_PATH, "/" + snapshot_file]
+
+
+def hash_file(path):
+    """sha256 and size in bytes of a file"""
+    with open(path, "rb", buffering=0) as f:
+        sha256 = hashlib.file_digest(f, "sha256").hexdigest()
+    return {"sha256": sha256, "size": os.path.getsize(path)}
+
+
+def hash_files(directory, files, workers=None):
+    """sha256 and size of each file, by path relative to the directory.
+
+    hashlib releases the GIL on large files, the files are hashed in threads.
+    """
+    paths = [os.path.join(directory, file.lstrip("/")) for file in files]
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        return dict(zip(files, executor.map(hash_file, paths)))
+
+
+def compress_file(path):
+    """Write the variants of a file that are smaller than it, returns their sizes
+    by encoding. Variants of a previous build which are not smaller are removed.
+    """
+    with open(path, "rb") as f:
+        data = f.read()
+    # mtime=0: the same file gives the same .gz, and the same sha256
+    variants = {"gzip": lambda: gzip.compress(data, compresslevel=9, mtime=0)}
+    if brotli is not None:
+        variants["br"] = lambda: brotli.compress(data)
+    sizes = {}
+    for encoding, compress in variants.items():
+        variant_path = path + COMPRESSED_SUFFIXES[encoding]
+        compressed = compress()
+        if len(compressed) < len(data):
+            with open(variant_path, "wb") as f:
+                f.write(compressed)
+            sizes[encoding] = len(compressed)
+        elif os.path.exists(variant_path):
+            os.remove(variant_path)
+    return sizes
+
+
+def compress_files(directory, assets, workers=None):
+    """Compressed sizes by encoding of each file, compressed in processes."""
+    files = [
+        file for file, asset in assets.items() if asset["size"] >= MIN_COMPRESSED_SIZE
+    ]
+    paths = [os.path.join(directory, file.lstrip("/")) for file in files]
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        return dict(zip(files, executor.map(compress_file, paths)))
+
+
+def get_download_size(asset):
+    """Bytes sent for a file, by its smallest variant"""
+    return min([asset["size"], *asset.get("compressed_sizes", {}).values()])
+
+
+def is_compressed_variant(file, files):
+    return any(
+        file.endswith(suffix) and file.removesuffix(suffix) in files
+        for suffix in COMPRESSED_SUFFIXES.values()
+    )
+
+
+def diff_assets(previous_assets, assets):
+    """Files added, changed and removed between two assets lists"""
+    added = [file for file in assets if file not in previous_assets]
+    changed = [
+        file
+        for file in assets
+        if file in previous_assets
+        and previous_assets[file]["sha256"] != assets[file]["sha256"]
+    ]
+    removed = [file for file in previous_assets if file not in assets]
+    return {
+        "added": added,
+        "changed": changed,
+        "removed": removed,
+        "download_size": sum(assets[file]["size"] for file in added + changed),
+        "compressed_download_size": sum(
+            get_download_size(assets[file]) for file in added + changed
+        ),
+    }
+
+
+def main(language, previous_assets_list=None, workers=None, compress=True):
     target_dir = f"dist/{language}"
 
     print(f"Listing all files in '{target_dir}':")
@@ -99,6 +234,23 @@ def main(language):
     version = package_json["version"]
     with open(extra_assets_file, "r") as f:
         extra_assets = json.load(f)
+    files = [file for file in files if os.path.basename(file) not in blacklist]
+    outdated_files = get_outdated_snapshot_files(
+        target_dir, package_json["dependencies"]["pyodide"]
+    )
+    files = [file for file in files if file not in outdated_files]
+    # the server picks the variants, they are not cached as files of their own
+    files = [file for file in files if not is_compressed_variant(file, set(files))]
+    assets = hash_files(target_dir, files, workers)
+    print(f"Total size: {sum(asset['size'] for asset in assets.values())} bytes")
+    if compress:
+        if brotli is None:
+            print("brotli is not installed, only gzip variants are written")
+        for file, sizes in compress_files(target_dir, assets, workers).items():
+            if sizes:
+                assets[file]["compressed_sizes"] = sizes
+        compressed_size = sum(get_download_size(asset) for asset in assets.values())
+        print(f"Total compressed size: {compressed_size} bytes")
     res = {
         "app_version": {
             "git_hash": get_git_revision_hash(),
@@ -107,17 +259,45 @@ def main(language):
             .isoformat(),
             "version": version,
         },
-        "files": [file for file in files if os.path.basename(file) not in blacklist]
-        + extra_assets["files"],
+        "files": files + extra_assets["files"],
+        # extra assets are versioned urls, they have no hash
+        "assets": assets,
     }
     with open(output_file, "w") as f:
         json.dump(res, f, indent=2)
 
+    if previous_assets_list:
+        with open(previous_assets_list, "r") as f:
+            previous = json.load(f)
+        # lists written before the hashes were added: every file has changed
+        diff = {
+            "previous_app_version": previous["app_version"],
+            **diff_assets(previous.get("assets", {}), assets),
+        }
+        with open(f"dist/{language}/assets_diff.json", "w") as f:
+            json.dump(diff, f, indent=2)
+        for key in ("added", "changed", "removed"):
+            for file in diff[key]:
+                print(f"{key}: {file}")
+        print(
+            f"Download size of the update: {diff['download_size']} bytes"
+            f" ({diff['compressed_download_size']} bytes compressed)"
+        )
+
 
 if __name__ == "__main__":
-    args = sys.argv[1:]
-    if len(args) > 1 and args[0] == "--language":
-        language = args[1]
-    else:
-        raise ValueError("Language is required: --language en|fr")
-    main(language)
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--language", required=True, choices=["en", "fr"])
+    parser.add_argument(
+        "--diff",
+        metavar="PREVIOUS_ASSETS_LIST",
+        help="assets_list.json of the previous release, e.g. downloaded from the deployed app",
+    )
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument(
+        "--no-compress",
+        action="store_true",
+        help="do not write the .gz and .br variants of the files",
+    )
+    args = parser.parse_args()
+    main(args.language, args.diff, args.workers, not args.no_compress)
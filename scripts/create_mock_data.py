@@ -2,14 +2,35 @@
 # requires-python = ">=3.12,<3.13"
 # dependencies = ["faker == 19.1.0"]
 # ///
+"""
+Create mock data for the database tables.
+
+Without arguments, 20 records of each table are written to mock_data.json. With
+--scale, tables of any size are generated in processes and streamed to one
+NDJSON file per table (or one JSON file with --format json), e.g.
+    uv run ./scripts/create_mock_data.py --scale 100000 --tables attachments spans
+The records depend only on --seed, --end-date and --chunk-size, not on the
+number of workers.
+"""
 
 from typing import TypedDict
+from datetime import datetime, timedelta
+from multiprocessing import Pool
+from contextlib import ExitStack
+import argparse
 import uuid
 import random
 import json
 import os
 from faker import Faker
 
+# shared by all the records, seeded by seed_generators
+rng = random.Random()
+fake = Faker()
+# timestamps are drawn from the two years before it
+timestamps_end = datetime.now()
+SCALE_CHUNK_SIZE = 10000
+
 
 class Attachment(TypedDict):
     uuid: str
@@ -148,13 +169,21 @@ class RegionalMaintenanceCenter(TypedDict):
     updated_at: str
     
 
+def seed_generators(seed, end_date: datetime):
+    global timestamps_end
+    rng.seed(seed)
+    fake.seed_instance(seed)
+    timestamps_end = end_date
+
+
 def generate_uuid():
-    return str(uuid.uuid4())
+    return str(uuid.UUID(int=rng.getrandbits(128), version=4))
 
 
 def generate_timestamp():
-    fake = Faker()
-    return fake.date_time_between(start_date='-2y', end_date='now').isoformat()
+    return fake.date_time_between(
+        start_date=timestamps_end - timedelta(days=730), end_date=timestamps_end
+    ).isoformat()
 
 
 def generate_attachment(index: int) -> Attachment:
@@ -166,38 +195,38 @@ def generate_attachment(index: int) -> Attachment:
         "support_internal_id": f"SUP-{support_number:04d}",
         "support_order": index,
         "support_number": support_number,
-        "support_catalog_internal_id": f"SCAT-{random.randint(1000, 9999)}",
+        "support_catalog_internal_id": f"SCAT-{rng.randint(1000, 9999)}",
         "support_short_name": f"S{support_number}",
         "support_name": f"Support {support_number}",
-        "tower_model": random.choice(["A-Type", "B-Type", "C-Type", "D-Type"]),
-        "line_angle": random.uniform(0, 45),
-        "support_ground_z": random.uniform(100, 500),
-        "support_ground_x": random.uniform(-1000, 1000),
-        "support_ground_y": random.uniform(-1000, 1000),
-        "attachment_type": random.choice(["Suspension", "Tension", "Anchor"]),
-        "attachment_set": f"AS-{random.randint(100, 999)}",
-        "attachment_set_z": random.uniform(20, 50),
-        "attachment_set_x": random.uniform(-10, 10),
-        "attachment_set_y": random.uniform(-10, 10),
-        "cross_arm_relative_altitude": random.uniform(0, 5),
-        "cross_arm_length": random.uniform(2, 8),
-        "chain_drn_catalog_internal_id": f"CDRN-{random.randint(1000, 9999)}",
-        "chain_drn_internal_id": f"CDRN-{random.randint(100, 999)}",
-        "chain_drn_short_name": f"CD{random.randint(10, 99)}",
-        "chain_drn_name": f"Chain DRN {random.randint(10, 99)}",
-        "chain_drn_length": random.uniform(1, 5),
-        "chain_drn_weight": random.uniform(50, 200),
-        "chain_drn_surface": random.choice(["Galvanized", "Coated", "Stainless"]),
-        "chain_inl_catalog_internal_id": f"CINL-{random.randint(1000, 9999)}",
-        "chain_inl_internal_id": f"CINL-{random.randint(100, 999)}",
-        "chain_inl_short_name": f"CI{random.randint(10, 99)}",
-        "chain_inl_name": f"Chain INL {random.randint(10, 99)}",
-        "chain_inl_length": random.uniform(1, 5),
-        "chain_inl_weight": random.uniform(50, 200),
-        "chain_inl_surface": random.choice(["Galvanized", "Coated", "Stainless"]),
-        "cable_attachment_z": random.uniform(20, 50),
-        "cable_attachment_x": random.uniform(-5, 5),
-        "cable_attachment_y": random.uniform(-5, 5),
+        "tower_model": rng.choice(["A-Type", "B-Type", "C-Type", "D-Type"]),
+        "line_angle": rng.uniform(0, 45),
+        "support_ground_z": rng.uniform(100, 500),
+        "support_ground_x": rng.uniform(-1000, 1000),
+        "support_ground_y": rng.uniform(-1000, 1000),
+        "attachment_type": rng.choice(["Suspension", "Tension", "Anchor"]),
+        "attachment_set": f"AS-{rng.randint(100, 999)}",
+        "attachment_set_z": rng.uniform(20, 50),
+        "attachment_set_x": rng.uniform(-10, 10),
+        "attachment_set_y": rng.uniform(-10, 10),
+        "cross_arm_relative_altitude": rng.uniform(0, 5),
+        "cross_arm_length": rng.uniform(2, 8),
+        "chain_drn_catalog_internal_id": f"CDRN-{rng.randint(1000, 9999)}",
+        "chain_drn_internal_id": f"CDRN-{rng.randint(100, 999)}",
+        "chain_drn_short_name": f"CD{rng.randint(10, 99)}",
+        "chain_drn_name": f"Chain DRN {rng.randint(10, 99)}",
+        "chain_drn_length": rng.uniform(1, 5),
+        "chain_drn_weight": rng.uniform(50, 200),
+        "chain_drn_surface": rng.choice(["Galvanized", "Coated", "Stainless"]),
+        "chain_inl_catalog_internal_id": f"CINL-{rng.randint(1000, 9999)}",
+        "chain_inl_internal_id": f"CINL-{rng.randint(100, 999)}",
+        "chain_inl_short_name": f"CI{rng.randint(10, 99)}",
+        "chain_inl_name": f"Chain INL {rng.randint(10, 99)}",
+        "chain_inl_length": rng.uniform(1, 5),
+        "chain_inl_weight": rng.uniform(50, 200),
+        "chain_inl_surface": rng.choice(["Galvanized", "Coated", "Stainless"]),
+        "cable_attachment_z": rng.uniform(20, 50),
+        "cable_attachment_x": rng.uniform(-5, 5),
+        "cable_attachment_y": rng.uniform(-5, 5),
     }
 
 
@@ -215,8 +244,8 @@ def generate_branch(index: int) -> Branch:
 
 def generate_section(index: int) -> Section:
     section_id = index + 1
-    first_support = random.randint(1, 50)
-    last_support = first_support + random.randint(5, 20)
+    first_support = rng.randint(1, 50)
+    last_support = first_support + rng.randint(5, 20)
     return {
         "uuid": generate_uuid(),
         "internal_id": f"SEC-{section_id:04d}",
@@ -224,19 +253,19 @@ def generate_section(index: int) -> Section:
         "short_name": f"S{section_id}",
         "created_at": generate_timestamp(),
         "updated_at": generate_timestamp(),
-        "internal_catalog_id": f"SCAT-{random.randint(1000, 9999)}",
-        "type": random.choice(["Transmission", "Distribution", "Interconnection"]),
-        "cable_name": f"Cable Type {random.choice(['A', 'B', 'C', 'D'])}{random.randint(100, 999)}",
-        "cable_short_name": f"C{random.randint(10, 99)}",
-        "cables_amount": random.randint(1, 6),
-        "optical_fibers_amount": random.randint(0, 24),
+        "internal_catalog_id": f"SCAT-{rng.randint(1000, 9999)}",
+        "type": rng.choice(["Transmission", "Distribution", "Interconnection"]),
+        "cable_name": f"Cable Type {rng.choice(['A', 'B', 'C', 'D'])}{rng.randint(100, 999)}",
+        "cable_short_name": f"C{rng.randint(10, 99)}",
+        "cables_amount": rng.randint(1, 6),
+        "optical_fibers_amount": rng.randint(0, 24),
         "spans_amount": last_support - first_support,
         "begin_span_name": f"Span {first_support}",
         "last_span_name": f"Span {last_support}",
         "first_support_number": first_support,
         "last_support_number": last_support,
-        "first_attachment_set": f"AS-{random.randint(100, 999)}",
-        "last_attachment_set": f"AS-{random.randint(100, 999)}",
+        "first_attachment_set": f"AS-{rng.randint(100, 999)}",
+        "last_attachment_set": f"AS-{rng.randint(100, 999)}",
     }
 
 
@@ -272,20 +301,20 @@ def generate_span(index: int) -> Span:
         "order": index,
         "unit_span_name": f"Span {span_id}",
         "short_name": f"SP{span_id}",
-        "section_internal_id": f"SEC-{random.randint(1000, 9999)}",
-        "section_short_name": f"S{random.randint(10, 99)}",
-        "section_name": f"Section {random.randint(10, 99)}",
-        "maintenance_center_internal_id": f"MC-{random.randint(100, 999)}",
-        "maintenance_center_designation": f"Maintenance Center {random.randint(1, 10)}",
-        "maintenance_team_internal_id": f"MT-{random.randint(100, 999)}",
-        "maintenance_team_designation": f"Team {random.choice(['Alpha', 'Beta', 'Gamma', 'Delta'])}",
-        "span_length": random.uniform(200, 500),
-        "first_support_internal_id": f"SUP-{random.randint(1000, 9999)}",
-        "last_support_internal_id": f"SUP-{random.randint(1000, 9999)}",
-        "first_attachment_set_internal_id": f"AS-{random.randint(100, 999)}",
-        "last_attachment_set_internal_id": f"AS-{random.randint(100, 999)}",
-        "first_chain_catalog_internal_id": f"CCAT-{random.randint(100, 999)}",
-        "last_chain_catalog_internal_id": f"CCAT-{random.randint(100, 999)}",
+        "section_internal_id": f"SEC-{rng.randint(1000, 9999)}",
+        "section_short_name": f"S{rng.randint(10, 99)}",
+        "section_name": f"Section {rng.randint(10, 99)}",
+        "maintenance_center_internal_id": f"MC-{rng.randint(100, 999)}",
+        "maintenance_center_designation": f"Maintenance Center {rng.randint(1, 10)}",
+        "maintenance_team_internal_id": f"MT-{rng.randint(100, 999)}",
+        "maintenance_team_designation": f"Team {rng.choice(['Alpha', 'Beta', 'Gamma', 'Delta'])}",
+        "span_length": rng.uniform(200, 500),
+        "first_support_internal_id": f"SUP-{rng.randint(1000, 9999)}",
+        "last_support_internal_id": f"SUP-{rng.randint(1000, 9999)}",
+        "first_attachment_set_internal_id": f"AS-{rng.randint(100, 999)}",
+        "last_attachment_set_internal_id": f"AS-{rng.randint(100, 999)}",
+        "first_chain_catalog_internal_id": f"CCAT-{rng.randint(100, 999)}",
+        "last_chain_catalog_internal_id": f"CCAT-{rng.randint(100, 999)}",
     }
 
 
@@ -323,22 +352,122 @@ def generate_regional_maintenance_center(index: int) -> RegionalMaintenanceCente
     }
 
 
+GENERATORS = {
+    "attachments": generate_attachment,
+    "branches": generate_branch,
+    "sections": generate_section,
+    "transit_links": generate_transit_link,
+    "tensions": generate_tension,
+    "spans": generate_span,
+    "lines": generate_line,
+    "maintenance_centers": generate_maintenance_center,
+    "regional_maintenance_centers": generate_regional_maintenance_center,
+}
+
+
 def generate_mock_data(count: int = 10):
     data = {
-        "attachments": [generate_attachment(i) for i in range(count)],
-        "branches": [generate_branch(i) for i in range(count)],
-        "sections": [generate_section(i) for i in range(count)],
-        "transit_links": [generate_transit_link(i) for i in range(count)],
-        "tensions": [generate_tension(i) for i in range(count)],
-        "spans": [generate_span(i) for i in range(count)],
-        "lines": [generate_line(i) for i in range(count)],
-        "maintenance_centers": [generate_maintenance_center(i) for i in range(count)],
-        "regional_maintenance_centers": [generate_regional_maintenance_center(i) for i in range(count)],
+        table: [generate(i) for i in range(count)]
+        for table, generate in GENERATORS.items()
     }
     return data
 
 
+def generate_chunk(chunk: tuple[str, int, int, int, datetime]) -> list[str]:
+    """JSON of the records start to stop of a table.
+
+    Each chunk has its own seed: the records do not depend on which process
+    generates them.
+    """
+    table, start, stop, seed, end_date = chunk
+    seed_generators(f"{seed}:{table}:{start}", end_date)
+    generate = GENERATORS[table]
+    return [json.dumps(generate(i)) for i in range(start, stop)]
+
+
+def generate_scale_mock_data(
+    count: int,
+    tables: list[str],
+    output_dir: str,
+    output_format: str = "ndjson",
+    seed: int = 0,
+    end_date: datetime | None = None,
+    workers: int | None = None,
+    chunk_size: int = SCALE_CHUNK_SIZE,
+):
+    """Stream count records of each table to output_dir, chunks are generated
+    in a pool of processes and written in order."""
+    end_date = end_date or datetime.now().replace(
+        hour=0, minute=0, second=0, microsecond=0
+    )
+    chunks = [
+        (table, start, min(start + chunk_size, count), seed, end_date)
+        for table in tables
+        # an empty chunk for empty tables
+        for start in range(0, max(count, 1), chunk_size)
+    ]
+    os.makedirs(output_dir, exist_ok=True)
+    with Pool(workers) as pool, ExitStack() as stack:
+
+        def open_file(name):
+            path = os.path.join(output_dir, name)
+            return stack.enter_context(open(path, "w"))
+
+        results = zip(chunks, pool.imap(generate_chunk, chunks))
+        if output_format == "ndjson":
+            files = {table: open_file(f"{table}.ndjson") for table in tables}
+            for (table, *_), records in results:
+                files[table].write("".join(record + "\n" for record in records))
+            return [file.name for file in files.values()]
+
+        # same shape as mock_data.json, without holding the tables in memory
+        file = open_file("mock_data.json")
+        file.write("{")
+        for (table, start, *_), records in results:
+            if start == 0:
+                separator = "" if table == tables[0] else "], "
+                file.write(f"{separator}{json.dumps(table)}: [")
+            elif records:
+                file.write(", ")
+            file.write(", ".join(records))
+        file.write("]}\n")
+        return [file.name]
+
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--scale", type=int, help="records of each table")
+    parser.add_argument(
+        "--tables", nargs="+", choices=list(GENERATORS), default=list(GENERATORS)
+    )
+    parser.add_argument("--format", choices=["ndjson", "json"], default="ndjson")
+    parser.add_argument("--output-dir", default="mock_data")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument(
+        "--end-date",
+        type=datetime.fromisoformat,
+        help="end of the timestamps, today by default",
+    )
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--chunk-size", type=int, default=SCALE_CHUNK_SIZE)
+    args = parser.parse_args()
+
+    if args.scale is not None:
+        paths = generate_scale_mock_data(
+            args.scale,
+            args.tables,
+            args.output_dir,
+            args.format,
+            args.seed,
+            args.end_date,
+            args.workers,
+            args.chunk_size,
+        )
+        for path in paths:
+            print(f"Mock data written to {path}")
+        raise SystemExit
+
     # Generate mock data
     mock_data = generate_mock_data(20)
     
@@ -0,0 +1,159 @@
+# /// script
+# requires-python = ">=3.12,<3.13"
+# dependencies = ["requests == 2.32.3"]
+# ///
+"""
+Content-addressed download cache of set_up_mechaphlowers.py.
+
+Files are stored under <cache directory>/sha256/<sha256 of their content>, and
+urls.json maps the downloaded urls to it: unchanged files cost no request.
+Wheels resolved by pip are kept in a directory per requirement instead.
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import subprocess
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+DOWNLOAD_CHUNK_SIZE = 2**20
+CACHE_URLS_LOCK = threading.Lock()
+# wheels of a complete pip download and their sha256
+WHEELS_MANIFEST = "wheels.json"
+
+
+def sha256sum(filename):
+    with open(filename, "rb", buffering=0) as f:
+        return hashlib.file_digest(f, "sha256").hexdigest()
+
+
+def download_to_cache(url, cache_directory, sha256=None, verify=True):
+    """Path of the content of url in the cache, downloaded if missing.
+
+    Files are stored under their sha256, and urls.json maps the downloaded urls
+    to it: a file with a known sha256 or an already downloaded url is not
+    fetched again. The download is streamed to disk and checked against sha256
+    when given.
+    """
+    blobs_directory = os.path.join(cache_directory, "sha256")
+    os.makedirs(blobs_directory, exist_ok=True)
+    if sha256 is None:
+        sha256 = read_cache_urls(cache_directory).get(url)
+    if sha256 is not None:
+        path = os.path.join(blobs_directory, sha256)
+        # a partial or corrupted file is downloaded again
+        if os.path.exists(path) and sha256sum(path) == sha256:
+            return path
+
+    digest = hashlib.sha256()
+    with tempfile.NamedTemporaryFile(dir=blobs_directory, delete=False) as file:
+        try:
+            with requests.get(url, timeout=10, stream=True, verify=verify) as response:
+                response.raise_for_status()
+                for chunk in response.iter_content(DOWNLOAD_CHUNK_SIZE):
+                    digest.update(chunk)
+                    file.write(chunk)
+        except BaseException:
+            os.remove(file.name)
+            raise
+    if sha256 is not None and digest.hexdigest() != sha256:
+        os.remove(file.name)
+        raise ValueError(
+            f"{url}: sha256 is {digest.hexdigest()}, {sha256} was expected"
+        )
+    sha256 = digest.hexdigest()
+    path = os.path.join(blobs_directory, sha256)
+    os.replace(file.name, path)
+    write_cache_url(cache_directory, url, sha256)
+    print(f"Downloaded {url}")
+    return path
+
+
+def read_cache_urls(cache_directory):
+    try:
+        with open(os.path.join(cache_directory, "urls.json")) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+
+
+def write_cache_url(cache_directory, url, sha256):
+    # downloads run in threads, each rewrites urls.json with its own url added
+    with CACHE_URLS_LOCK:
+        urls = read_cache_urls(cache_directory)
+        urls[url] = sha256
+        path = os.path.join(cache_directory, "urls.json")
+        with open(path + ".tmp", "w") as f:
+            json.dump(urls, f, indent=2, sort_keys=True)
+        os.replace(path + ".tmp", path)
+
+
+def download_files_in_directory(downloads, directory, cache_directory, workers=8):
+    """Copy the cached content of each (url, sha256) to directory, under the
+    file name of the url, with up to workers downloads at a time."""
+    os.makedirs(directory, exist_ok=True)
+
+    def download(url_sha256):
+        url, sha256 = url_sha256
+        path = download_to_cache(url, cache_directory, sha256)
+        shutil.copyfile(path, os.path.join(directory, url.split("/")[-1]))
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        # list() raises the first download error
+        list(executor.map(download, downloads))
+
+
+def read_cached_wheels(wheels_directory):
+    """Wheels listed in the manifest of wheels_directory, None unless they are
+    all there with their sha256."""
+    try:
+        with open(os.path.join(wheels_directory, WHEELS_MANIFEST)) as f:
+            wheels = json.load(f)
+    except FileNotFoundError:
+        return None
+    for name, sha256 in wheels.items():
+        path = os.path.join(wheels_directory, name)
+        if not os.path.exists(path) or sha256sum(path) != sha256:
+            return None
+    return list(wheels)
+
+
+def download_wheels(requirement, wheels_directory, uv_index=None):
+    """File names of the wheels of requirement and of its dependencies, downloaded
+    in wheels_directory by pip unless a previous download there is complete.
+
+    The manifest is written once pip succeeded: an interrupted or corrupted
+    download is done again from an empty directory.
+    """
+    wheels = read_cached_wheels(wheels_directory)
+    if wheels is not None:
+        print(f"Using the wheels cached in {wheels_directory}")
+        return wheels
+    shutil.rmtree(wheels_directory, ignore_errors=True)
+    os.makedirs(wheels_directory)
+    process_args = [
+        "uvx",
+        "--python",
+        ">=3.12,<3.13",
+        "pip",
+        "download",
+        requirement,
+        "-d",
+        wheels_directory,
+    ]
+    if uv_index:
+        process_args.append(f"--index-url={uv_index}")
+    subprocess.run(process_args, check=True)
+    wheels = {
+        name: sha256sum(os.path.join(wheels_directory, name))
+        for name in sorted(os.listdir(wheels_directory))
+        if name.endswith(".whl")
+    }
+    with open(os.path.join(wheels_directory, WHEELS_MANIFEST), "w") as f:
+        json.dump(wheels, f, indent=2, sort_keys=True)
+    return list(wheels)
@@ -0,0 +1,362 @@
+# /// script
+# requires-python = ">=3.12,<3.13"
+# ///
+"""
+Generate synthetic getLit task inputs ({"section": ..., "cable": ...}).
+
+Supports stand along a terrain profile: their foot altitude follows the ground
+at the distance given by the span lengths, and their attachment altitude is the
+foot altitude plus the height of the support. The inputs are written as NDJSON,
+one per line, and only depend on the arguments, e.g. to stress the solver:
+    uv run ./scripts/generate_sections.py --count 20 --supports 200 \\
+        --terrain mountain | uv run ./scripts/run_sections.py
+"""
+
+import argparse
+import json
+import math
+import random
+import sys
+
+# Aluminium alloy conductors, linear stress-strain law
+CABLES = {
+    "ASTER 228": {
+        "id": "aster-228",
+        "name": "ASTER 228",
+        "data_source": "synthetic",
+        "section": 227.8,
+        "diameter": 19.6,
+        "young_modulus": 60000,
+        "linear_mass": 0.63,
+        "dilatation_coefficient": 23e-6,
+        "temperature_reference": 15,
+        "stress_strain_a0": 0,
+        "stress_strain_a1": 60000,
+        "stress_strain_a2": 0,
+        "stress_strain_a3": 0,
+        "stress_strain_a4": 0,
+        "stress_strain_b0": 0,
+        "stress_strain_b1": 0,
+        "stress_strain_b2": 0,
+        "stress_strain_b3": 0,
+        "stress_strain_b4": 0,
+        "is_polynomial": False,
+        "diameter_heart": 0,
+        "section_conductor": 227.8,
+        "section_heart": 0,
+        "solar_absorption": 0.9,
+        "emissivity": 0.8,
+        "electric_resistance_20": 0.146,
+        "linear_resistance_temperature_coef": 0.036,
+        "radial_thermal_conductivity": 1,
+        "has_magnetic_heart": False,
+    },
+    "ASTER 366": {
+        "id": "aster-366",
+        "name": "ASTER 366",
+        "data_source": "synthetic",
+        "section": 366.2,
+        "diameter": 24.85,
+        "young_modulus": 60000,
+        "linear_mass": 1.01,
+        "dilatation_coefficient": 23e-6,
+        "temperature_reference": 15,
+        "stress_strain_a0": 0,
+        "stress_strain_a1": 60000,
+        "stress_strain_a2": 0,
+        "stress_strain_a3": 0,
+        "stress_strain_a4": 0,
+        "stress_strain_b0": 0,
+        "stress_strain_b1": 0,
+        "stress_strain_b2": 0,
+        "stress_strain_b3": 0,
+        "stress_strain_b4": 0,
+        "is_polynomial": False,
+        "diameter_heart": 0,
+        "section_conductor": 366.2,
+        "section_heart": 0,
+        "solar_absorption": 0.9,
+        "emissivity": 0.8,
+        "electric_resistance_20": 0.0908,
+        "linear_resistance_temperature_coef": 0.036,
+        "radial_thermal_conductivity": 1,
+        "has_magnetic_heart": False,
+    },
+    "ASTER 600": {
+        "id": "aster-600",
+        "name": "ASTER 600",
+        "data_source": "synthetic",
+        "section": 600.4,
+        "diameter": 31.86,
+        "young_modulus": 60000,
+        "linear_mass": 1.8,
+        "dilatation_coefficient": 23e-6,
+        "temperature_reference": 15,
+        "stress_strain_a0": 0,
+        "stress_strain_a1": 60000,
+        "stress_strain_a2": 0,
+        "stress_strain_a3": 0,
+        "stress_strain_a4": 0,
+        "stress_strain_b0": 0,
+        "stress_strain_b1": 0,
+        "stress_strain_b2": 0,
+        "stress_strain_b3": 0,
+        "stress_strain_b4": 0,
+        "is_polynomial": False,
+        "diameter_heart": 0,
+        "section_conductor": 600.4,
+        "section_heart": 0,
+        "solar_absorption": 0.9,
+        "emissivity": 0.8,
+        "electric_resistance_20": 0.0554,
+        "linear_resistance_temperature_coef": 0.036,
+        "radial_thermal_conductivity": 1,
+        "has_magnetic_heart": False,
+    },
+}
+
+# supports are raised up to this height (m) to keep the cable from lifting them
+MAX_SUPPORT_HEIGHT = 100
+# vertical load on a support from the cable, at least this share of its weight
+MIN_VERTICAL_LOAD_RATIO = 0.5
+
+# ground profile: altitude, then (amplitude, wavelength) of the undulations, in m
+# span lengths, line angles (grad) and support heights are drawn in the ranges
+TERRAINS = {
+    "flat": {
+        "altitude": 0,
+        "undulations": [],
+        "span_length": (300, 500),
+        "span_angle": (-5, 5),
+        "support_height": (25, 35),
+    },
+    "hilly": {
+        "altitude": 150,
+        "undulations": [(40, 4000), (15, 1300)],
+        "span_length": (250, 450),
+        "span_angle": (-10, 10),
+        "support_height": (25, 45),
+    },
+    "mountain": {
+        "altitude": 900,
+        "undulations": [(250, 12000), (60, 3000), (10, 900)],
+        "span_length": (250, 600),
+        "span_angle": (-15, 15),
+        "support_height": (30, 55),
+    },
+}
+
+
+def terrain_profile(terrain: str, seed: int = 0):
+    """Ground altitude as a function of the distance along the line."""
+    rng = random.Random(f"{seed}:{terrain}")
+    altitude = TERRAINS[terrain]["altitude"]
+    undulations = [
+        (amplitude, wavelength, rng.uniform(0, 2 * math.pi))
+        for amplitude, wavelength in TERRAINS[terrain]["undulations"]
+    ]
+
+    def ground_altitude(distance: float) -> float:
+        return altitude + sum(
+            amplitude * math.sin(2 * math.pi * distance / wavelength + phase)
+            for amplitude, wavelength, phase in undulations
+        )
+
+    return ground_altitude
+
+
+def raise_valley_supports(
+    attachment_altitudes: list[float],
+    foot_altitudes: list[float],
+    span_lengths: list[float],
+    sagging_parameter: float,
+):
+    """Raise the supports the cable would lift up, in place.
+
+    The vertical load of the cable on support i, per unit weight, is
+    (a + b) / 2 + p * ((h_i - h_i-1) / a - (h_i+1 - h_i) / b) for spans a and b
+    (parabola approximation). In a valley it becomes negative and the solver
+    does not converge: as on real lines, such supports are made taller.
+    """
+    p = sagging_parameter
+    for _ in range(len(attachment_altitudes)):
+        raised = False
+        for i in range(1, len(attachment_altitudes) - 1):
+            a, b = span_lengths[i - 1], span_lengths[i]
+            min_altitude = (
+                p * (attachment_altitudes[i - 1] / a + attachment_altitudes[i + 1] / b)
+                - (1 - MIN_VERTICAL_LOAD_RATIO) * (a + b) / 2
+            ) / (p / a + p / b)
+            max_altitude = foot_altitudes[i] + MAX_SUPPORT_HEIGHT
+            altitude = min(min_altitude, max_altitude)
+            if altitude > attachment_altitudes[i] + 1e-6:
+                attachment_altitudes[i] = altitude
+                raised = True
+        if not raised:
+            return
+
+
+def generate_supports(
+    support_count: int, terrain: str, seed: int, sagging_parameter: float = 2000
+) -> list[dict]:
+    rng = random.Random(seed)
+    ranges = TERRAINS[terrain]
+    ground_altitude = terrain_profile(terrain, seed)
+    supports = []
+    distance = 0.0
+    for index in range(support_count):
+        last = index == support_count - 1
+        span_length = None if last else rng.uniform(*ranges["span_length"])
+        # the ends of the section are anchored in line
+        span_angle = 0 if index == 0 or last else rng.uniform(*ranges["span_angle"])
+        foot_altitude = ground_altitude(distance)
+        supports.append(
+            {
+                "uuid": f"support-{index}",
+                "number": str(index + 1),
+                "name": f"S{index}",
+                "spanLength": span_length,
+                "spanAngle": span_angle,
+                "attachmentSet": None,
+                "attachmentHeight": foot_altitude
+                + rng.uniform(*ranges["support_height"]),
+                "heightBelowConsole": None,
+                "cableType": None,
+                "armLength": 0,
+                "chainName": None,
+                "chainLength": 3,
+                "chainWeight": 500,
+                "chainV": None,
+                "counterWeight": None,
+                "supportFootAltitude": foot_altitude,
+                "attachmentPosition": None,
+                "chainSurface": None,
+            }
+        )
+        distance += span_length or 0
+    attachment_altitudes = [support["attachmentHeight"] for support in supports]
+    raise_valley_supports(
+        attachment_altitudes,
+        [support["supportFootAltitude"] for support in supports],
+        [support["spanLength"] for support in supports],
+        sagging_parameter,
+    )
+    for support, altitude in zip(supports, attachment_altitudes):
+        support["attachmentHeight"] = altitude
+    return supports
+
+
+def generate_section(
+    support_count: int,
+    seed: int = 0,
+    terrain: str = "flat",
+    cable: str = "ASTER 600",
+    sagging_parameter: float = 2000,
+) -> dict:
+    """Section with the fields of the Section interface, ready for init_section."""
+    supports = generate_supports(support_count, terrain, seed, sagging_parameter)
+    name = f"{terrain} {support_count} supports, seed {seed}"
+    return {
+        "uuid": f"synthetic-{terrain}-{support_count}-{seed}",
+        "internal_id": f"synthetic-{terrain}-{support_count}-{seed}",
+        "name": name,
+        "short_name": f"{terrain[:3].upper()}{support_count}",
+        "created_at": "2025-01-01T00:00:00",
+        "updated_at": "2025-01-01T00:00:00",
+        "internal_catalog_id": "synthetic",
+        "type": "synthetic",
+        "electric_phase_number": 3,
+        "cable_name": cable,
+        "cable_short_name": cable,
+        "cables_amount": 1,
+        "optical_fibers_amount": 0,
+        "spans_amount": support_count - 1,
+        "begin_span_name": f"{supports[0]['name']}-{supports[1]['name']}",
+        "last_span_name": f"{supports[-2]['name']}-{supports[-1]['name']}",
+        "first_support_number": 1,
+        "last_support_number": support_count,
+        "first_attachment_set": "1",
+        "last_attachment_set": "1",
+        "regional_maintenance_center_names": [],
+        "maintenance_center_names": [],
+        "regional_team_id": None,
+        "maintenance_team_id": None,
+        "maintenance_center_id": None,
+        "link_name": None,
+        "lit": None,
+        "branch_name": None,
+        "voltage_idr": None,
+        "comment": None,
+        "supports_comment": None,
+        "supports": supports,
+        "initial_conditions": [
+            {
+                "uuid": "initial-condition",
+                "name": "synthetic",
+                "base_parameters": sagging_parameter,
+                "base_temperature": 15,
+                "cable_pretension": 0,
+                "min_temperature": -10,
+                "max_wind_pressure": 0,
+                "max_frost_width": 0,
+            }
+        ],
+        "selected_initial_condition_uuid": "initial-condition",
+        "charges": [],
+        "selected_charge_uuid": None,
+    }
+
+
+def generate_inputs(
+    support_count: int,
+    seed: int = 0,
+    terrain: str = "flat",
+    cable: str = "ASTER 600",
+    sagging_parameter: float = 2000,
+) -> dict:
+    """getLit task inputs"""
+    return {
+        "section": generate_section(
+            support_count, seed, terrain, cable, sagging_parameter
+        ),
+        "cable": CABLES[cable],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--count", type=int, default=1, help="sections to generate")
+    parser.add_argument("--supports", type=int, default=10)
+    parser.add_argument("--terrain", choices=list(TERRAINS), default="flat")
+    parser.add_argument("--cable", choices=list(CABLES), default="ASTER 600")
+    parser.add_argument(
+        "--sagging-parameter",
+        type=float,
+        default=2000,
+        help="base parameter of the initial condition (m)",
+    )
+    parser.add_argument(
+        "--seed", type=int, default=0, help="section i is generated with seed + i"
+    )
+    parser.add_argument("--output", "-o", default="-", help=".ndjson file or -")
+    args = parser.parse_args()
+    if args.supports < 2:
+        parser.error("a section has at least 2 supports")
+
+    output = sys.stdout if args.output == "-" else open(args.output, "w")
+    with output:
+        for index in range(args.count):
+            inputs = generate_inputs(
+                args.supports,
+                args.seed + index,
+                args.terrain,
+                args.cable,
+                args.sagging_parameter,
+            )
+            output.write(json.dumps(inputs) + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+/**
+ * Copyright (c) 2025, RTE (http://www.rte-france.com)
+ * This Source Code Form is subject to the terms of the Mozilla Public
+ * License, v. 2.0. If a copy of the MPL was not distributed with this
+ * file, You can obtain one at http://mozilla.org/MPL/2.0/.
+ */
+
+// Makes a Pyodide memory snapshot with the worker packages loaded and
+// functions.py run, restored by loadPyodideAndPackages in worker-python.ts.
+// Called by set_up_mechaphlowers.py:
+//   node make_pyodide_snapshot.mjs <pyodide version> <pyodide directory>
+//     <python-packages.json> <functions.py> <package cache directory>
+//     <getLit inputs.json> <pyodide package>...
+// Pyodide packages are read from the package cache directory, or downloaded
+// from the CDN when missing, local wheels are read from the pyodide directory.
+// _makeSnapshot and _loadSnapshot are private loadPyodide options: the script
+// refuses any other pyodide than the pinned version. The snapshot is restored
+// and runs init_section on the given inputs before it is written, snapshot.json
+// last: the worker and the service worker only use a snapshot listed there.
+import { createHash } from 'node:crypto';
+import { readFile, rm, writeFile } from 'node:fs/promises';
+import path from 'node:path';
+import { loadPyodide, version } from 'pyodide';
+
+const SNAPSHOT_FILE = 'snapshot.bin';
+const METADATA_FILE = 'snapshot.json';
+
+const [
+  pinnedVersion,
+  pyodideDirectory,
+  packagesPath,
+  functionsPath,
+  packageCacheDir,
+  checkInputsPath,
+  ...pyodidePackages
+] = process.argv.slice(2);
+
+// a failed build leaves no snapshot behind
+await rm(path.join(pyodideDirectory, METADATA_FILE), { force: true });
+await rm(path.join(pyodideDirectory, SNAPSHOT_FILE), { force: true });
+if (version !== pinnedVersion) {
+  throw new Error(
+    `pyodide ${version} is installed, snapshots are made with ${pinnedVersion}`
+  );
+}
+
+const pythonPackages = JSON.parse(await readFile(packagesPath, 'utf-8'));
+const localPackages = Object.values(pythonPackages)
+  .filter((pkg) => pkg.source === 'local')
+  .map((pkg) => pkg.file_name);
+const functionsScript = await readFile(functionsPath, 'utf-8');
+
+const options = {
+  packageCacheDir,
+  packages: [
+    ...pyodidePackages,
+    ...localPackages.map((fileName) =>
+      path.resolve(pyodideDirectory, fileName)
+    )
+  ]
+};
+const pyodide = await loadPyodide({ ...options, _makeSnapshot: true });
+pyodide.runPython(functionsScript);
+pyodide.runPython('warm_up()');
+const snapshot = pyodide.makeMemorySnapshot();
+
+// restored as the worker does it: functions.py is not run again
+const checkInputs = JSON.parse(await readFile(checkInputsPath, 'utf-8'));
+const restored = await loadPyodide({ ...options, _loadSnapshot: snapshot });
+const result = restored.globals
+  .get('init_section')(checkInputs)
+  .toJs({ dict_converter: Object.fromEntries });
+if (result.error !== undefined) {
+  throw new Error(
+    `init_section failed on the restored snapshot: ${result.error}`
+  );
+}
+
+await writeFile(path.join(pyodideDirectory, SNAPSHOT_FILE), snapshot);
+await writeFile(
+  path.join(pyodideDirectory, METADATA_FILE),
+  JSON.stringify(
+    {
+      file: SNAPSHOT_FILE,
+      pyodideVersion: version,
+      // same order as the packages given to loadPyodide by the worker
+      packages: [...pyodidePackages, ...localPackages],
+      functionsSha256: createHash('sha256')
+        .update(functionsScript)
+        .digest('hex')
+    },
+    null,
+    2
+  )
+);
+console.log(
+  `Pyodide ${version} snapshot written to ${pyodideDirectory}/${SNAPSHOT_FILE}` +
+    ` (${(snapshot.byteLength / 2 ** 20).toFixed(1)} MiB)`
+);
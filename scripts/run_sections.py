@@ -0,0 +1,192 @@
+# /// script
+# requires-python = ">=3.12,<3.13"
+# dependencies = ["mechaphlowers == 0.4.3"]
+# ///
+"""
+Solve sections outside the browser with the python worker functions.
+
+Each input is the JSON sent to the getLit task ({"section": ..., "cable": ...}):
+.json files hold one input, .ndjson files and stdin one input per line, e.g.
+the synthetic sections written by generate_sections.py.
+Sections are solved in a process pool, results are written as NDJSON (one line
+per section, in input order) or, when the output ends with .npz, as arrays
+named "<index>/<field>" plus a "summary" JSON string holding the sections and
+their non-numeric fields.
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import math
+import multiprocessing
+import os
+import runpy
+import sys
+import time
+from pathlib import Path
+from typing import Iterator
+
+import numpy as np
+
+FUNCTIONS_PATH = (
+    "./src/app/core/services/worker_python/tasks/python-scripts/functions.py"
+)
+
+functions: dict = {}
+options: dict = {}
+
+
+def read_inputs(paths: list[str]) -> Iterator[dict]:
+    if not paths:
+        paths = ["-"]
+    for path in paths:
+        if path == "-":
+            lines = sys.stdin
+        elif Path(path).suffix == ".json":
+            yield json.loads(Path(path).read_text())
+            continue
+        else:
+            lines = open(path)
+        for line in lines:
+            if line.strip():
+                yield json.loads(line)
+
+
+def init_worker(worker_options: dict):
+    # functions.py keeps its solved sections in module globals: one copy per process
+    options.update(worker_options)
+    with contextlib.redirect_stdout(io.StringIO()):
+        functions.update(runpy.run_path(FUNCTIONS_PATH))
+
+
+def solve(indexed_inputs: tuple[int, dict]) -> dict:
+    index, inputs = indexed_inputs
+    start = time.perf_counter()
+    result = None
+    error = None
+    log = sys.stderr if options["verbose"] else io.StringIO()
+    try:
+        with contextlib.redirect_stdout(log):
+            result = functions["init_section"](inputs)
+            if options["climate"] is not None and "error" not in result:
+                wind_pressure, cable_temperature, ice_thickness = options["climate"]
+                result = functions["change_climate_load"](
+                    {
+                        "windPressure": wind_pressure,
+                        "cableTemperature": cable_temperature,
+                        "iceThickness": ice_thickness,
+                    }
+                )
+        if "error" in result:
+            error = result.pop("error")
+            result = None
+    except Exception as exception:
+        error = f"{type(exception).__name__}: {exception}"
+    return {
+        "index": index,
+        "uuid": inputs.get("section", {}).get("uuid"),
+        "time": time.perf_counter() - start,
+        "error": error,
+        "result": result,
+    }
+
+
+def to_json_value(value):
+    # numpy arrays to lists and NaN to null, to write strict JSON
+    if isinstance(value, np.ndarray):
+        value = value.tolist()
+    if isinstance(value, dict):
+        return {key: to_json_value(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [to_json_value(item) for item in value]
+    if isinstance(value, float) and math.isnan(value):
+        return None
+    return value
+
+
+def to_npz_array(value) -> np.ndarray | None:
+    # numeric arrays only: np.load refuses object arrays without allow_pickle
+    if isinstance(value, dict):
+        return None
+    try:
+        array = np.asarray(value)
+    except ValueError:  # ragged lists
+        return None
+    return array if array.dtype.kind in "biuf" else None
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("inputs", nargs="*", help=".json/.ndjson files, - for stdin")
+    parser.add_argument("--output", "-o", default="-", help=".ndjson, .npz or -")
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument(
+        "--chunksize", type=int, default=4, help="sections sent to a worker at once"
+    )
+    parser.add_argument(
+        "--climate",
+        type=float,
+        nargs=3,
+        metavar=("WIND_PRESSURE", "CABLE_TEMPERATURE", "ICE_THICKNESS"),
+        help="also solve this climate (Pa, °C, cm) like changeClimateLoad",
+    )
+    parser.add_argument(
+        "--verbose", action="store_true", help="print the worker logs on stderr"
+    )
+    args = parser.parse_args()
+
+    npz = args.output.endswith(".npz")
+    arrays = {}
+    summary = []
+    start = time.perf_counter()
+    output = sys.stdout if args.output == "-" or npz else open(args.output, "w")
+    worker_options = {"climate": args.climate, "verbose": args.verbose}
+    with multiprocessing.Pool(
+        args.workers, initializer=init_worker, initargs=(worker_options,)
+    ) as pool:
+        for section in pool.imap(
+            solve, enumerate(read_inputs(args.inputs)), chunksize=args.chunksize
+        ):
+            result = section.pop("result")
+            # phase timings of the tasks go to the summary, next to the section time
+            section["timings"] = result.pop("timings", None) if result else None
+            summary.append(section)
+            if npz:
+                # the other fields (solver stats, window...) go to the summary
+                fields = {}
+                for name, value in (result or {}).items():
+                    array = to_npz_array(value)
+                    if array is None:
+                        fields[name] = to_json_value(value)
+                    else:
+                        arrays[f"{section['index']}/{name}"] = array
+                section["result"] = fields or None
+            else:
+                section["result"] = to_json_value(result)
+                output.write(json.dumps(section) + "\n")
+                output.flush()
+            if section["error"]:
+                print(
+                    f"section {section['index']} ({section['uuid']}) failed: "
+                    f"{section['error']}",
+                    file=sys.stderr,
+                )
+    if npz:
+        np.savez_compressed(args.output, summary=json.dumps(summary), **arrays)
+    elif output is not sys.stdout:
+        output.close()
+
+    failed = sum(section["error"] is not None for section in summary)
+    print(
+        f"{len(summary) - failed} sections solved, {failed} failed "
+        f"in {time.perf_counter() - start:.1f}s",
+        file=sys.stderr,
+    )
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
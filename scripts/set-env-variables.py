@@ -1,17 +1,14 @@
 # /// script
 # requires-python = ">=3.12,<3.13"
 # ///
+import argparse
 import datetime
 import json
 import os
-
-# Read package.json file
-with open("package.json", "r") as file:
-    package_json = json.load(file)
-    version = package_json["version"]
-
-# Get current time in ISO format
-build_time = datetime.datetime.now().isoformat()
+import re
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
 
 env_variables = [
     "{API_URL}",
@@ -19,47 +16,97 @@ env_variables = [
 ]
 
 
-def replace_in_file(file_path):
-    """Replace placeholders in a single file"""
-    try:
-        with open(file_path, "r") as file:
-            content = file.read()
+def get_replacements():
+    """Value of each placeholder, env variables that are not set are left as is"""
+    # Read package.json file
+    with open("package.json", "r") as file:
+        package_json = json.load(file)
+    replacements = {
+        "{BUILD_VERSION}": package_json["version"],
+        # Get current time in ISO format
+        "{BUILD_TIME}": datetime.datetime.now().isoformat(),
+    }
+    for env_variable in env_variables:
+        variable_key = env_variable.replace("{", "").replace("}", "")
+        if os.getenv(variable_key):
+            replacements[env_variable] = os.getenv(variable_key)
+    return {
+        placeholder.encode(): value.encode()
+        for placeholder, value in replacements.items()
+    }
+
+
+def compile_placeholders(replacements):
+    """One pattern matching all the placeholders, files are scanned once"""
+    return re.compile(b"|".join(re.escape(placeholder) for placeholder in replacements))
 
-        # Check if file contains any placeholders
-        if any(
-            placeholder in content
-            for placeholder in [
-                "{BUILD_VERSION}",
-                "{BUILD_TIME}",
-                *env_variables,
-            ]
-        ):
-            content = content.replace("{BUILD_VERSION}", version)
-            content = content.replace("{BUILD_TIME}", build_time)
-            for env_variable in env_variables:
-                variable_key = env_variable.replace("{", "").replace("}", "")
-                if os.getenv(variable_key):
-                    content = content.replace(env_variable, os.getenv(variable_key))
 
-            with open(file_path, "w") as file:
+def replace_in_file(file_path, pattern, replacements, dry_run=False):
+    """Replace placeholders in a single file, returns the count of each one"""
+    matches = Counter()
+
+    def replace(match):
+        matches[match.group().decode()] += 1
+        return replacements[match.group()]
+
+    try:
+        # bytes: the bundles are not decoded and encoded again
+        with open(file_path, "rb") as file:
+            content = file.read()
+        content, count = pattern.subn(replace, content)
+        # files without placeholders are not written again
+        if count and not dry_run:
+            with open(file_path, "wb") as file:
                 file.write(content)
     except Exception as e:
         print(f"Error processing {file_path}: {e}")
+    return matches
+
 
+def process_directory_recursively(directory, dry_run=False, workers=None):
+    """Recursively process all files in a directory, in parallel"""
+    file_paths = [
+        os.path.join(root, file)
+        for root, dirs, files in os.walk(directory)
+        for file in files
+        if file.endswith(".js")
+    ]
+    replacements = get_replacements()
+    replace = partial(
+        replace_in_file,
+        pattern=compile_placeholders(replacements),
+        replacements=replacements,
+        dry_run=dry_run,
+    )
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        return dict(zip(file_paths, executor.map(replace, file_paths, chunksize=8)))
 
-def process_directory_recursively(directory):
-    """Recursively process all files in a directory"""
-    # processed_files = 0
-    for root, dirs, files in os.walk(directory):
-        for file in files:
-            if file.endswith(".js"):
-                file_path = os.path.join(root, file)
-                replace_in_file(file_path)
 
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "--dry-run",
+        action="store_true",
+        help="list the placeholders found in each file without replacing them",
+    )
+    parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args()
 
-# Process all files in dist folder recursively
-if os.path.exists("dist"):
-    process_directory_recursively("dist")
-    print("Updated all files in dist folder")
-else:
-    print("dist directory not found")
+    # Process all files in dist folder recursively
+    if os.path.exists("dist"):
+        matches = process_directory_recursively("dist", args.dry_run, args.workers)
+        if args.dry_run:
+            for file_path, file_matches in matches.items():
+                if file_matches:
+                    found = ", ".join(
+                        f"{placeholder} x{count}"
+                        for placeholder, count in sorted(file_matches.items())
+                    )
+                    print(f"{file_path}: {found}")
+        updated = sum(1 for file_matches in matches.values() if file_matches)
+        print(
+            f"{'Would update' if args.dry_run else 'Updated'} {updated} of"
+            f" {len(matches)} files in dist folder"
+        )
+    else:
+        print("dist directory not found")
@@ -2,7 +2,6 @@
 # requires-python = ">=3.12,<3.13"
 # dependencies = ["requests == 2.32.3", "pyodide-build == 0.30.6"]
 # ///
-import hashlib
 import json
 import os
 import shutil
@@ -11,15 +10,42 @@ import subprocess
 import tarfile
 import tempfile
 import argparse
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
 
 import requests
 from pyodide_build.cli.py_compile import main as pyodide_build  # type: ignore
 
+from download_cache import (
+    download_files_in_directory,
+    download_to_cache,
+    download_wheels,
+)
+from generate_sections import generate_inputs
+
 PYODIDE_VERSION = "0.27.4"
+PYODIDE_CDN_URL = f"https://cdn.jsdelivr.net/pyodide/v{PYODIDE_VERSION}/full"
+CACHE_DIRECTORY_PATH = os.path.join(
+    os.environ.get("XDG_CACHE_HOME", os.path.expanduser("~/.cache")),
+    "phlowers-stellar-app",
+)
 MECHAPHLOWERS_VERSION = "0.4.3"
 PYODIDE_DIRECTORY_PATH = "./public/pyodide"
 PYODIDE_LOCK_PATH = "./public/pyodide/pyodide-lock.json"
 PYODIDE_PACKAGES_PATH = "./src/app/core/services/worker_python/python-packages.json"
+FUNCTIONS_PATH = (
+    "./src/app/core/services/worker_python/tasks/python-scripts/functions.py"
+)
+SNAPSHOT_SCRIPT_PATH = "./scripts/make_pyodide_snapshot.mjs"
+# supports of the section solved by the restored snapshot before it is written
+SNAPSHOT_CHECK_SUPPORTS = 6
+TRACE_SCRIPT_PATH = "./scripts/trace_task_imports.py"
+# packages kept whole in the pruned wheels: they import modules on demand that
+# the traced tasks do not reach, e.g. pandera's error reports of invalid sections
+WHEEL_KEPT_PACKAGES = {"mechaphlowers", "pandera"}
+PYTHON_MODULE_SUFFIXES = (".py", ".pyc", ".so")
+# packages loaded from the pyodide distribution by worker-python.ts
+WORKER_PYODIDE_PACKAGES = ["numpy", "pandas", "pydantic", "packaging", "wrapt"]
 NEEDED_PYODIDE_SOURCE_FILES = [
     "pyodide.asm.wasm",
     "pyodide.asm.js",
@@ -44,18 +70,18 @@ def get_all_wheel_file_names_in_directory(directory):
     ]
 
 
-def download_file_in_directory(url, directory):
-    response = requests.get(url, timeout=10)
-    response.raise_for_status()  # Raise an exception for HTTP errors
-    name = os.path.join(directory, url.split("/")[-1])
-    with open(name, "wb") as file:
-        file.write(response.content)
-    print(f"Downloaded {name}")
-
-
-def sha256sum(filename):
-    with open(filename, "rb", buffering=0) as f:
-        return hashlib.file_digest(f, "sha256").hexdigest()
+def get_pyodide_package_downloads(pyodide_lock_content, package_names, cdn_url):
+    """(url, sha256) of the pyodide packages and of their dependencies."""
+    packages = pyodide_lock_content["packages"]
+    downloads = {}
+    names = [name.replace("_", "-") for name in package_names]
+    while names:
+        package = packages[names.pop()]
+        url = f"{cdn_url}/{package['file_name']}"
+        if url not in downloads:
+            downloads[url] = package["sha256"]
+            names.extend(name.replace("_", "-") for name in package["depends"])
+    return list(downloads.items())
 
 
 def delete_files_starting_with(directory, start_string):
@@ -67,20 +93,12 @@ def delete_files_starting_with(directory, start_string):
             print(f"Deleted {name}")
 
 
-def download_and_extract_tgz(url, target_dir):
-    # Create a temporary directory to store the downloaded file
-    with tempfile.TemporaryDirectory() as temp_dir:
-        # Download the .tgz file
-        tgz_path = os.path.join(temp_dir, "pyodide.tgz")
-        response = requests.get(url, timeout=10, verify=False)
-        response.raise_for_status()
-        with open(tgz_path, "wb") as f:
-            f.write(response.content)
-
-        # Extract the .tgz file
-        with tarfile.open(tgz_path, "r:gz") as tar:
-            tar.extractall(path=target_dir)
-        print(f"Downloaded and extracted {url} to {target_dir}")
+def download_and_extract_tgz(url, target_dir, cache_directory):
+    # the tarball of a version does not change, it is only downloaded once
+    tgz_path = download_to_cache(url, cache_directory, verify=False)
+    with tarfile.open(tgz_path, "r:gz") as tar:
+        tar.extractall(path=target_dir)
+    print(f"Extracted {url} to {target_dir}")
 
 
 def keep_only_needed_files(directory, needed_files):
@@ -103,12 +121,150 @@ def keep_only_needed_files(directory, needed_files):
     print(f"Removed package directory")
 
 
+def trace_task_imports(uv_index=None):
+    """Names of the modules imported by the worker tasks, None if tracing fails."""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        output_path = os.path.join(temp_dir, "modules.json")
+        # uv options go before the script, the ones after it are the script's
+        process_args = ["uv", "run"]
+        if uv_index:
+            process_args.append(f"--index-url={uv_index}")
+        process_args += [TRACE_SCRIPT_PATH, "--output", output_path]
+        try:
+            subprocess.run(process_args, check=True)
+        except (OSError, subprocess.CalledProcessError) as error:
+            print(f"Task imports not traced, packages are not pruned: {error}")
+            return None
+        with open(output_path) as f:
+            return set(json.load(f))
+
+
+def get_module_name(path):
+    """Module of an archive entry, e.g. pint/facets/__init__.pyc -> pint.facets.
+
+    None for data files.
+    """
+    parts = path.split("/")
+    if not parts[-1].endswith(PYTHON_MODULE_SUFFIXES):
+        return None
+    # mod.cpython-312.pyc or mod.cpython-312-wasm32-emscripten.so -> mod
+    stem = parts[-1].split(".")[0]
+    package = [part for part in parts[:-1] if part != "__pycache__"]
+    return ".".join(package if stem == "__init__" else package + [stem])
+
+
+def prune_archive(path, modules, kept_packages=()):
+    """Rewrite a wheel or zip without the python modules that are never imported.
+
+    Data files are dropped with the closest package holding python modules, when
+    it is not imported. Returns the archive size before and after.
+    """
+    size = os.path.getsize(path)
+    with zipfile.ZipFile(path) as archive:
+        entries = archive.infolist()
+        # packages holding python modules other than __init__: the data files
+        # of packages with only an __init__ are kept with it
+        code_packages = {
+            get_module_name(entry.filename).rpartition(".")[0]
+            for entry in entries
+            if get_module_name(entry.filename)
+            and not os.path.basename(entry.filename).startswith("__init__.")
+        }
+
+        def is_kept(name):
+            if ".dist-info/" in name:
+                return True
+            module = get_module_name(name)
+            is_init = os.path.basename(name).startswith("__init__.")
+            if module is None or (is_init and module not in code_packages):
+                # data files and data packages follow their closest code package
+                module = os.path.dirname(name).replace("/__pycache__", "")
+                module = module.replace("/", ".")
+                while module and module not in code_packages:
+                    module = module.rpartition(".")[0]
+                if not module:
+                    return True
+            return module in modules or module.split(".")[0] in kept_packages
+
+        kept_entries = [entry for entry in entries if is_kept(entry.filename)]
+        if len(kept_entries) == len(entries):
+            return size, size
+        temp_path = path + ".tmp"
+        with zipfile.ZipFile(temp_path, "w") as pruned_archive:
+            for entry in kept_entries:
+                data = archive.read(entry)
+                if entry.filename.endswith(".dist-info/RECORD"):
+                    # the RECORD of a wheel lists its files
+                    kept_names = {kept.filename for kept in kept_entries}
+                    data = "".join(
+                        line
+                        for line in data.decode().splitlines(keepends=True)
+                        if line.split(",", 1)[0] in kept_names
+                    ).encode()
+                pruned_archive.writestr(entry, data)
+    os.replace(temp_path, path)
+    return size, os.path.getsize(path)
+
+
+def make_pyodide_snapshot(package_cache_directory):
+    """Make the memory snapshot restored by the worker at startup.
+
+    Without it, or if it fails, the worker imports the packages and functions.py
+    itself: the snapshot only speeds up the startup. The snapshot script checks
+    it by running init_section on a synthetic section once restored.
+    """
+    with tempfile.TemporaryDirectory() as temp_dir:
+        check_inputs_path = os.path.join(temp_dir, "inputs.json")
+        with open(check_inputs_path, "w") as f:
+            json.dump(generate_inputs(SNAPSHOT_CHECK_SUPPORTS), f)
+        try:
+            subprocess.run(
+                [
+                    "node",
+                    SNAPSHOT_SCRIPT_PATH,
+                    PYODIDE_VERSION,
+                    PYODIDE_DIRECTORY_PATH,
+                    PYODIDE_PACKAGES_PATH,
+                    FUNCTIONS_PATH,
+                    package_cache_directory,
+                    check_inputs_path,
+                    *WORKER_PYODIDE_PACKAGES,
+                ],
+                check=True,
+            )
+        except (OSError, subprocess.CalledProcessError) as error:
+            print(f"Pyodide snapshot not created: {error}")
+
+
 if __name__ == "__main__":
     parser = argparse.ArgumentParser()
     parser.add_argument("--uv-index", type=str, default=None)
     parser.add_argument(
         "--npm-registry-url", type=str, default="https://registry.npmjs.org/"
     )
+    parser.add_argument(
+        "--pyodide-cdn-url",
+        type=str,
+        default=PYODIDE_CDN_URL,
+        help="where the pyodide packages loaded by the snapshot are downloaded",
+    )
+    parser.add_argument(
+        "--cache-dir",
+        type=str,
+        default=CACHE_DIRECTORY_PATH,
+        help="downloads are kept there and not fetched again",
+    )
+    parser.add_argument("--download-workers", type=int, default=8)
+    parser.add_argument(
+        "--no-prune",
+        action="store_true",
+        help="ship whole wheels instead of the imported modules",
+    )
+    parser.add_argument(
+        "--no-snapshot",
+        action="store_true",
+        help="do not make the pyodide memory snapshot used to start the worker",
+    )
     args = parser.parse_args()
 
     npm_registry_url = args.npm_registry_url
@@ -123,34 +279,48 @@ if __name__ == "__main__":
 
     # Download and extract the pyodide .tgz file
     print("Downloading pyodide")
-    download_and_extract_tgz(pyodide_url, PYODIDE_DIRECTORY_PATH)
+    download_and_extract_tgz(pyodide_url, PYODIDE_DIRECTORY_PATH, args.cache_dir)
 
     # Keep only the needed files
     keep_only_needed_files(PYODIDE_DIRECTORY_PATH, NEEDED_PYODIDE_SOURCE_FILES)
 
+    with open(PYODIDE_LOCK_PATH) as f:
+        pyodide_lock_content = json.load(f)
+    # get the lock file for pyodide
+
+    # the snapshot loads the worker pyodide packages from this directory, they
+    # are downloaded while the wheel files are prepared
+    package_cache_directory = os.path.join(
+        args.cache_dir, "pyodide-packages", PYODIDE_VERSION
+    )
+    background = ThreadPoolExecutor(max_workers=1)
+    if not args.no_snapshot:
+        pyodide_packages_download = background.submit(
+            download_files_in_directory,
+            get_pyodide_package_downloads(
+                pyodide_lock_content, WORKER_PYODIDE_PACKAGES, args.pyodide_cdn_url
+            ),
+            package_cache_directory,
+            args.cache_dir,
+            args.download_workers,
+        )
+
     print("Downloading mechaphlowers wheel files")
-    # get the wheel file for mechaphlowers
-    process_args = [
-        "uvx",
-        "--python",
-        ">=3.12,<3.13",
-        "pip",
-        "download",
-        f"mechaphlowers=={MECHAPHLOWERS_VERSION}",
-        "-d",
-        PYODIDE_DIRECTORY_PATH,
-    ]
-    if uv_index:
-        process_args.append(f"--index-url={uv_index}")
-    subprocess.run(process_args)
+    # mechaphlowers and its dependencies, pip only runs when the version changes
+    wheels_directory = os.path.join(
+        args.cache_dir, "wheels", f"mechaphlowers-{MECHAPHLOWERS_VERSION}"
+    )
+    for wheel in download_wheels(
+        f"mechaphlowers=={MECHAPHLOWERS_VERSION}", wheels_directory, uv_index
+    ):
+        shutil.copyfile(
+            os.path.join(wheels_directory, wheel),
+            os.path.join(PYODIDE_DIRECTORY_PATH, wheel),
+        )
     print("Building wheel files")
     # compile the wheel files to pyc
     pyodide_build(Path(PYODIDE_DIRECTORY_PATH), False, False, 6, "")
 
-    with open(PYODIDE_LOCK_PATH) as f:
-        pyodide_lock_content = json.load(f)
-    # get the lock file for pyodide
-
     wheel_names = get_all_wheel_file_names_in_directory(PYODIDE_DIRECTORY_PATH)
     mechaphlowers_packages = {}
     for wheel in wheel_names:
@@ -195,8 +365,34 @@ if __name__ == "__main__":
                         ],
                         "source": "remote",
                     }
+    # keep only the modules imported by the tasks in the files served locally
+    modules = None if args.no_prune else trace_task_imports(uv_index)
+    if modules is not None:
+        print("Pruning wheel files")
+        for package in all_packages.values():
+            if package["source"] != "local":
+                continue
+            size, pruned_size = prune_archive(
+                os.path.join(PYODIDE_DIRECTORY_PATH, package["file_name"]),
+                modules,
+                WHEEL_KEPT_PACKAGES,
+            )
+            package["size"] = pruned_size
+            package["unpruned_size"] = size
+            print(f"{package['file_name']}: {size} -> {pruned_size} bytes")
+
     # write to file
     with open(PYODIDE_PACKAGES_PATH, "w", encoding="utf-8") as pyodide_packages:
         json.dump(
             all_packages, pyodide_packages, ensure_ascii=False, indent=4, sort_keys=True
         )
+
+    if not args.no_snapshot:
+        print("Making pyodide snapshot")
+        try:
+            pyodide_packages_download.result()
+        except (OSError, ValueError, requests.RequestException) as error:
+            # the snapshot then downloads the packages itself
+            print(f"Pyodide packages not downloaded: {error}")
+        make_pyodide_snapshot(package_cache_directory)
+    background.shutdown()
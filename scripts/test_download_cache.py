@@ -0,0 +1,119 @@
+"""
+Tests of download_cache.py against a local http.server stand-in:
+    npm run test-python
+"""
+
+import hashlib
+import http.server
+import json
+import os
+import threading
+from types import SimpleNamespace
+
+import pytest
+
+import download_cache
+from download_cache import download_to_cache, download_wheels, sha256sum
+
+CONTENT = b"wheel content" * 1000
+CONTENT_SHA256 = hashlib.sha256(CONTENT).hexdigest()
+
+
+@pytest.fixture
+def server(tmp_path):
+    root = tmp_path / "server"
+    root.mkdir()
+    (root / "package.whl").write_bytes(CONTENT)
+    paths = []
+
+    class Handler(http.server.SimpleHTTPRequestHandler):
+        def __init__(self, *args, **kwargs):
+            super().__init__(*args, directory=str(root), **kwargs)
+
+        def do_GET(self):
+            paths.append(self.path)
+            super().do_GET()
+
+        def log_message(self, format, *args):
+            pass
+
+    httpd = http.server.ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield SimpleNamespace(url=f"http://127.0.0.1:{httpd.server_port}", paths=paths)
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def list_blobs(cache_directory):
+    return sorted(os.listdir(os.path.join(cache_directory, "sha256")))
+
+
+def test_cache_hit_makes_no_request(server, tmp_path):
+    url = f"{server.url}/package.whl"
+
+    path = download_to_cache(url, tmp_path / "cache", CONTENT_SHA256)
+    # by url, and by sha256 for another url with the same content
+    assert download_to_cache(url, tmp_path / "cache") == path
+    assert download_to_cache(f"{url}?copy", tmp_path / "cache", CONTENT_SHA256) == path
+
+    assert server.paths == ["/package.whl"]
+    assert os.path.basename(path) == CONTENT_SHA256
+    assert sha256sum(path) == CONTENT_SHA256
+
+
+def test_sha256_mismatch_raises_and_leaves_no_blob(server, tmp_path):
+    url = f"{server.url}/package.whl"
+
+    with pytest.raises(ValueError, match="sha256"):
+        download_to_cache(url, tmp_path / "cache", "0" * 64)
+
+    assert list_blobs(tmp_path / "cache") == []
+    assert not (tmp_path / "cache" / "urls.json").exists()
+
+
+def test_corrupted_blob_is_fetched_again(server, tmp_path):
+    url = f"{server.url}/package.whl"
+    path = download_to_cache(url, tmp_path / "cache", CONTENT_SHA256)
+    with open(path, "r+b") as f:
+        f.truncate(10)
+
+    assert download_to_cache(url, tmp_path / "cache") == path
+
+    assert server.paths == ["/package.whl", "/package.whl"]
+    assert sha256sum(path) == CONTENT_SHA256
+    assert list_blobs(tmp_path / "cache") == [CONTENT_SHA256]
+
+
+def test_missing_file_raises_and_leaves_no_blob(server, tmp_path):
+    with pytest.raises(download_cache.requests.HTTPError):
+        download_to_cache(f"{server.url}/missing.whl", tmp_path / "cache")
+
+    assert list_blobs(tmp_path / "cache") == []
+
+
+def test_complete_wheels_are_not_downloaded_again(monkeypatch, tmp_path):
+    calls = []
+
+    def pip_download(process_args, check):
+        # writes the wheel pip would download
+        calls.append(process_args)
+        directory = process_args[process_args.index("-d") + 1]
+        with open(os.path.join(directory, "package.whl"), "wb") as f:
+            f.write(CONTENT)
+
+    monkeypatch.setattr(download_cache.subprocess, "run", pip_download)
+    wheels_directory = str(tmp_path / "wheels")
+
+    assert download_wheels("package==1.0", wheels_directory) == ["package.whl"]
+    assert download_wheels("package==1.0", wheels_directory) == ["package.whl"]
+    assert len(calls) == 1
+    with open(os.path.join(wheels_directory, "wheels.json")) as f:
+        assert json.load(f) == {"package.whl": CONTENT_SHA256}
+
+    # a corrupted wheel makes the cached download incomplete
+    with open(os.path.join(wheels_directory, "package.whl"), "wb") as f:
+        f.write(b"corrupted")
+    assert download_wheels("package==1.0", wheels_directory) == ["package.whl"]
+    assert len(calls) == 2
+    assert sha256sum(os.path.join(wheels_directory, "package.whl")) == CONTENT_SHA256
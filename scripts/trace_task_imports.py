@@ -0,0 +1,97 @@
+# /// script
+# requires-python = ">=3.12,<3.13"
+# dependencies = ["mechaphlowers == 0.4.3"]
+# ///
+"""
+List the modules imported by the python worker: functions.py is run and each of
+its tasks is called on a synthetic section, then the names in sys.modules are
+written as a JSON list. set_up_mechaphlowers.py prunes the wheels shipped to
+the browser down to these modules.
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import runpy
+import sys
+
+FUNCTIONS_PATH = (
+    "./src/app/core/services/worker_python/tasks/python-scripts/functions.py"
+)
+BENCHMARK_PATH = "./scripts/benchmark_tasks.py"
+
+
+def run_tasks(functions: dict, benchmark: dict):
+    support_count = 6
+    section = benchmark["generate_section"](support_count)
+    cable = benchmark["CABLE"]
+    functions["init_section"]({"section": section, "cable": cable})
+    functions["change_climate_load"](
+        {"windPressure": 300, "cableTemperature": 40, "iceThickness": 1}
+    )
+    for view in ("2d", "3d"):
+        functions["refresh_projection"](
+            {"startSupport": 1, "endSupport": 3, "view": view}
+        )
+    functions["refresh_projection"](
+        {
+            "startSupport": 1,
+            "endSupport": 3,
+            "view": "3d",
+            "outputFormat": "buffers",
+            "precision": "float32",
+            "lod": {"tolerance": 1},
+            "window": {"margin": 1},
+        }
+    )
+    functions["update_supports"](
+        {"supports": [{"uuid": section["supports"][2]["uuid"], "chainLength": 4}]}
+    )
+    functions["sweep_climate_load"](
+        {"windPressure": [0, 200, 400], "cableTemperature": 15, "iceThickness": 0}
+    )
+    functions["get_climate_sensitivity"]({"steps": {"windPressure": 20}})
+    functions["set_obstacles"](
+        {
+            "obstacles": {
+                "uuid": ["tree", "building"],
+                "type": ["vegetation", "building"],
+                "x": [200, 900],
+                "y": [5, -10],
+                "z": [0, 10],
+            }
+        }
+    )
+    functions["get_obstacle_clearances"]({"maxDistance": 100})
+    batch = functions["solve_sections"](
+        {"sections": [{"section": section, "cable": cable}]}
+    )
+    for _ in batch:
+        pass
+    functions["get_support_coordinates"](
+        benchmark["generate_support_shape"](support_count)
+    )
+    functions["get_diagnostics"]({"reset": True})
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--output", default="-", help="JSON file, - for stdout")
+    args = parser.parse_args()
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        functions = runpy.run_path(FUNCTIONS_PATH)
+        benchmark = runpy.run_path(BENCHMARK_PATH)
+        run_tasks(functions, benchmark)
+
+    modules = json.dumps(sorted(sys.modules), indent=2)
+    if args.output == "-":
+        print(modules)
+    else:
+        with open(args.output, "w") as file:
+            file.write(modules + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+/**
+ * Copyright (c) 2025, RTE (http://www.rte-france.com)
+ * This Source Code Form is subject to the terms of the Mozilla Public
+ * License, v. 2.0. If a copy of the MPL was not distributed with this
+ * file, You can obtain one at http://mozilla.org/MPL/2.0/.
+ */
+import packageJson from '../../../../../package.json';
+import {
+  fetchPyodideSnapshot,
+  PyodideSnapshotMetadata,
+  SNAPSHOT_PYODIDE_VERSION
+} from './pyodide-snapshot';
+
+describe('fetchPyodideSnapshot', () => {
+  const snapshot = new ArrayBuffer(8);
+  const packages = ['numpy', 'mechaphlowers-0.4.3-cp312-none-any.whl'];
+  let metadata: PyodideSnapshotMetadata;
+  let mockFetch: jest.Mock;
+
+  beforeEach(() => {
+    metadata = {
+      file: 'snapshot.bin',
+      pyodideVersion: '0.27.4',
+      packages,
+      // sha256 of the script, digest is mocked to 2 zero bytes
+      functionsSha256: '0000'
+    };
+    mockFetch = jest.fn().mockResolvedValue({
+      ok: true,
+      json: () => Promise.resolve(metadata),
+      arrayBuffer: () => Promise.resolve(snapshot)
+    });
+    Object.defineProperty(global, 'fetch', {
+      value: mockFetch,
+      writable: true
+    });
+    Object.defineProperty(global, 'crypto', {
+      value: {
+        subtle: { digest: jest.fn().mockResolvedValue(new ArrayBuffer(2)) }
+      },
+      writable: true
+    });
+    jest.spyOn(console, 'warn').mockImplementation();
+  });
+
+  it('should return the snapshot when it matches the worker', async () => {
+    const result = await fetchPyodideSnapshot(
+      'test/pyodide/',
+      '0.27.4',
+      packages,
+      'script'
+    );
+
+    expect(mockFetch).toHaveBeenCalledWith('test/pyodide/snapshot.json');
+    expect(mockFetch).toHaveBeenCalledWith('test/pyodide/snapshot.bin');
+    expect(result).toBe(snapshot);
+  });
+
+  it('should ignore a snapshot of another pyodide version', async () => {
+    metadata.pyodideVersion = '0.28.0';
+
+    const result = await fetchPyodideSnapshot(
+      'test/pyodide/',
+      '0.27.4',
+      packages,
+      'script'
+    );
+
+    expect(result).toBeUndefined();
+    expect(mockFetch).toHaveBeenCalledTimes(1);
+  });
+
+  it('should not fetch a snapshot for an unpinned pyodide', async () => {
+    const result = await fetchPyodideSnapshot(
+      'test/pyodide/',
+      '0.28.0',
+      packages,
+      'script'
+    );
+
+    expect(result).toBeUndefined();
+    expect(mockFetch).not.toHaveBeenCalled();
+  });
+
+  it('should pin the pyodide version of package.json', () => {
+    expect(SNAPSHOT_PYODIDE_VERSION).toBe(packageJson.dependencies.pyodide);
+  });
+
+  it('should ignore a snapshot made with other packages', async () => {
+    const result = await fetchPyodideSnapshot(
+      'test/pyodide/',
+      '0.27.4',
+      ['numpy'],
+      'script'
+    );
+
+    expect(result).toBeUndefined();
+  });
+
+  it('should ignore a snapshot of another functions.py', async () => {
+    metadata.functionsSha256 = 'other';
+
+    const result = await fetchPyodideSnapshot(
+      'test/pyodide/',
+      '0.27.4',
+      packages,
+      'script'
+    );
+
+    expect(result).toBeUndefined();
+  });
+
+  it('should return undefined without snapshot', async () => {
+    mockFetch.mockResolvedValueOnce({ ok: false });
+
+    const result = await fetchPyodideSnapshot(
+      'test/pyodide/',
+      '0.27.4',
+      packages,
+      'script'
+    );
+
+    expect(result).toBeUndefined();
+  });
+});
@@ -0,0 +1,69 @@
+/**
+ * Copyright (c) 2025, RTE (http://www.rte-france.com)
+ * This Source Code Form is subject to the terms of the Mozilla Public
+ * License, v. 2.0. If a copy of the MPL was not distributed with this
+ * file, You can obtain one at http://mozilla.org/MPL/2.0/.
+ */
+
+// Snapshots are made and restored with the private _makeSnapshot and
+// _loadSnapshot options of loadPyodide: only with this version, the one pinned
+// in package.json and by scripts/set_up_mechaphlowers.py
+export const SNAPSHOT_PYODIDE_VERSION = '0.27.4';
+
+// Written next to the snapshot by scripts/make_pyodide_snapshot.mjs
+export interface PyodideSnapshotMetadata {
+  file: string;
+  pyodideVersion: string;
+  // packages given to loadPyodide, local wheels by file name
+  packages: string[];
+  functionsSha256: string;
+}
+
+export const sha256 = async (text: string) => {
+  const digest = await crypto.subtle.digest(
+    'SHA-256',
+    new TextEncoder().encode(text)
+  );
+  return Array.from(new Uint8Array(digest))
+    .map((byte) => byte.toString(16).padStart(2, '0'))
+    .join('');
+};
+
+/**
+ * Fetches the memory snapshot built by scripts/set_up_mechaphlowers.py, with
+ * the packages and functions.py already imported. Returns undefined when there
+ * is none, when pyodide is not the pinned SNAPSHOT_PYODIDE_VERSION, or when it
+ * was built for another pyodide version, other packages or another
+ * functions.py: the worker then imports them itself.
+ */
+export const fetchPyodideSnapshot = async (
+  directoryUrl: string,
+  pyodideVersion: string,
+  packages: string[],
+  functionsScript: string
+): Promise<ArrayBuffer | undefined> => {
+  if (pyodideVersion !== SNAPSHOT_PYODIDE_VERSION) {
+    return undefined;
+  }
+  try {
+    const response = await fetch(directoryUrl + 'snapshot.json');
+    if (!response.ok) {
+      return undefined;
+    }
+    const metadata: PyodideSnapshotMetadata = await response.json();
+    const isUpToDate =
+      metadata.pyodideVersion === pyodideVersion &&
+      metadata.packages.length === packages.length &&
+      metadata.packages.every((name, index) => name === packages[index]) &&
+      metadata.functionsSha256 === (await sha256(functionsScript));
+    if (!isUpToDate) {
+      console.warn('Pyodide snapshot is outdated, importing the packages');
+      return undefined;
+    }
+    const snapshot = await fetch(directoryUrl + metadata.file);
+    return snapshot.ok ? await snapshot.arrayBuffer() : undefined;
+  } catch (error) {
+    console.warn('Pyodide snapshot could not be fetched', error);
+    return undefined;
+  }
+};
@@ -41,6 +41,7 @@ describe('Task handlers', () => {
       jest
         .spyOn(performance, 'now')
         .mockReturnValueOnce(1000) // Start time
+        .mockReturnValueOnce(1400) // Python function end
         .mockReturnValueOnce(1500); // End time
 
       const mockToJs = jest.fn().mockReturnValue(mockResult);
@@ -78,6 +79,7 @@ describe('Task handlers', () => {
       jest
         .spyOn(performance, 'now')
         .mockReturnValueOnce(1000) // Start time
+        .mockReturnValueOnce(1100) // Python function end
         .mockReturnValueOnce(1200); // End time
 
       const mockToJs = jest.fn().mockReturnValue(mockResult);
@@ -101,6 +103,62 @@ describe('Task handlers', () => {
       expect(result).toEqual({ result: mockResult, runTime: 200, error: null });
     });
 
+    it('should add the toJs time to the result timings', async () => {
+      const mockResult = { spans: [], timings: { total: 80 } };
+      jest
+        .spyOn(performance, 'now')
+        .mockReturnValueOnce(1000) // Start time
+        .mockReturnValueOnce(1100) // Python function end
+        .mockReturnValueOnce(1130); // End time
+      (mockPyodide.globals.get as jest.Mock).mockReturnValueOnce(() => ({
+        toJs: jest.fn().mockReturnValue(mockResult),
+        destroy: jest.fn()
+      }));
+
+      const result = await handleTask<Task.refreshProjection>(
+        mockPyodide,
+        Task.refreshProjection,
+        { startSupport: 0, endSupport: 1, view: '3d' }
+      );
+
+      expect(mockPyodide.globals.get).toHaveBeenCalledWith(
+        'refresh_projection'
+      );
+      expect(result.result?.timings).toEqual({ total: 80, toJs: 30 });
+      expect(result.runTime).toBe(130);
+    });
+
+    it('should report generator values as progress', async () => {
+      const sectionResult = { index: 0, uuid: 'section-1', error: null };
+      const summary = { solved: 1, failed: 0 };
+      const toProxy = (value: object) => ({
+        toJs: jest.fn().mockReturnValue(value),
+        destroy: jest.fn()
+      });
+      const next = jest
+        .fn()
+        .mockReturnValueOnce({ done: false, value: toProxy(sectionResult) })
+        .mockReturnValueOnce({ done: true, value: toProxy(summary) });
+      const generator = { type: 'generator', next, destroy: jest.fn() };
+      (mockPyodide.globals.get as jest.Mock).mockReturnValueOnce(
+        () => generator
+      );
+      const onProgress = jest.fn();
+
+      const result = await handleTask(
+        mockPyodide,
+        Task.solveSections,
+        { sections: [] },
+        onProgress
+      );
+
+      expect(mockPyodide.globals.get).toHaveBeenCalledWith('solve_sections');
+      expect(onProgress).toHaveBeenCalledTimes(1);
+      expect(onProgress).toHaveBeenCalledWith(sectionResult);
+      expect(result.result).toEqual(summary);
+      expect(generator.destroy).toHaveBeenCalled();
+    });
+
     it('should handle unknown task', async () => {
       // Setup
       const consoleSpy = jest.spyOn(console, 'error').mockImplementation();
@@ -5,10 +5,17 @@
  * file, You can obtain one at http://mozilla.org/MPL/2.0/.
  */
 import { loadPyodide } from 'pyodide';
-import type { PyProxy } from 'pyodide/ffi';
+import type { PyGenerator, PyProxy } from 'pyodide/ffi';
 import functions from './python-scripts/functions.py';
 import testsScript from './python-scripts/tests.py';
-import { Task, TaskError, TaskInputs, TaskOutputs } from './types';
+import {
+  Task,
+  TaskError,
+  TaskInputs,
+  TaskProgressOf,
+  TaskResult,
+  TaskTimings
+} from './types';
 
 export type PyodideAPI = Awaited<ReturnType<typeof loadPyodide>>;
 
@@ -44,15 +51,80 @@ const tasks: Record<
     script: functions,
     function: 'refresh_projection',
     externalPackages: []
+  },
+  [Task.sweepClimateLoad]: {
+    script: functions,
+    function: 'sweep_climate_load',
+    externalPackages: []
+  },
+  [Task.updateSupports]: {
+    script: functions,
+    function: 'update_supports',
+    externalPackages: []
+  },
+  [Task.solveSections]: {
+    script: functions,
+    function: 'solve_sections',
+    externalPackages: []
+  },
+  [Task.getDiagnostics]: {
+    script: functions,
+    function: 'get_diagnostics',
+    externalPackages: []
+  },
+  [Task.getClimateSensitivity]: {
+    script: functions,
+    function: 'get_climate_sensitivity',
+    externalPackages: []
+  },
+  [Task.setObstacles]: {
+    script: functions,
+    function: 'set_obstacles',
+    externalPackages: []
+  },
+  [Task.getObstacleClearances]: {
+    script: functions,
+    function: 'get_obstacle_clearances',
+    externalPackages: []
   }
 };
 
-export async function handleTask<taskId extends Task>(
+const toJs = (value: unknown) => {
+  if (!value || typeof value !== 'object' || !('toJs' in value)) {
+    return value;
+  }
+  const proxy = value as PyProxy;
+  const valueJs = proxy.toJs({ dict_converter: Object.fromEntries });
+  proxy.destroy();
+  return valueJs;
+};
+
+// Python generators report each yielded value as progress, the task result
+// is their return value
+const consumeGenerator = (
+  generator: PyGenerator,
+  onProgress?: (progress: unknown) => void
+) => {
+  for (;;) {
+    const { done, value } = generator.next();
+    const valueJs = toJs(value);
+    if (done) {
+      return valueJs;
+    }
+    onProgress?.(valueJs);
+  }
+};
+
+export async function handleTask<
+  taskId extends Task,
+  Inputs extends TaskInputs[taskId] = TaskInputs[taskId]
+>(
   pyodide: PyodideAPI,
   task: Task,
-  inputs: TaskInputs[taskId]
+  inputs: Inputs,
+  onProgress?: (progress: TaskProgressOf<taskId>) => void
 ): Promise<{
-  result: TaskOutputs[taskId] | null;
+  result: TaskResult<taskId, Inputs> | null;
   runTime: number;
   error: TaskError | null;
 }> {
@@ -73,11 +145,25 @@ export async function handleTask<taskId extends Task>(
       inputs?: TaskInputs[taskId]
     ) => PyProxy;
     const result = inputs ? functionToRun(inputs) : functionToRun();
-    const resultJs = result.toJs({ dict_converter: Object.fromEntries });
+    const toJsStart = performance.now();
+    const resultJs =
+      result.type === 'generator'
+        ? consumeGenerator(
+            result as PyGenerator,
+            onProgress as (progress: unknown) => void
+          )
+        : result.toJs({ dict_converter: Object.fromEntries });
     result.destroy();
+    const end = performance.now();
+    const timings = (resultJs as { timings?: TaskTimings } | undefined)
+      ?.timings;
+    if (timings && result.type !== 'generator') {
+      // consuming a generator also runs its python code: no toJs time
+      timings.toJs = end - toJsStart;
+    }
     return {
-      result: resultJs as TaskOutputs[taskId],
-      runTime: performance.now() - start,
+      result: resultJs as TaskResult<taskId, Inputs>,
+      runTime: end - start,
       error: null
     };
   } catch (error: any) {
@@ -1,22 +1,65 @@
 import numpy as np
 import pandas as pd
+import pandera as pa
 from mechaphlowers.entities.arrays import SectionArray, CableArray
-from mechaphlowers.data.catalog.catalog import sample_cable_catalog
-from mechaphlowers.data.catalog import sample_support_catalog
 import mechaphlowers as mph
 from mechaphlowers import BalanceEngine, PlotEngine
+from mechaphlowers.core.models.balance.solvers.balance_solver import BalanceSolver
 from typing import Optional
 from dataclasses import dataclass
+import dataclasses
 from typing import List
 import math
+import time
 from mechaphlowers.entities.shapes import SupportShape
+from mechaphlowers.core.geometry.points import Points, SectionPoints
+from mechaphlowers.core.geometry.references import (
+    cable_to_beta_plane,
+    cable_to_localsection_frame,
+    translate_cable_to_support_from_attachments,
+)
+from collections import OrderedDict, deque
+from contextlib import contextmanager
+import copy
+import functools
+import hashlib
+import inspect
 
 import json
 
-from importlib.metadata import version
-
-print("mechaphlowers version: ", version("mechaphlowers"))
+# the sample catalogs are not imported: they read yaml and csv files when imported,
+# which delays every task. mechaphlowers already imports the other modules.
+print("mechaphlowers version: ", mph.__version__)
 RESOLUTION = 100
+# level of detail: max distance (m) between a catenary and the polyline drawing it,
+# for spans outside the inspected window and for previews
+LOD_TOLERANCE = 0.5
+LOD_MIN_POINTS = 3
+# supports kept on each side of a requested window
+WINDOW_MARGIN = 1
+# support fields used to build the SectionArray, see generate_section_data
+SUPPORT_NUMERIC_FIELDS = (
+    "attachmentHeight",
+    "spanLength",
+    "spanAngle",
+    "armLength",
+    "chainLength",
+    "chainWeight",
+    "supportFootAltitude",
+)
+# memory budget shared by all the solved sections kept in the session registry
+SESSION_CACHE_MAX_BYTES = 128 * 1024 * 1024
+# task runs kept for the rolling timing statistics, see get_diagnostics
+TIMING_WINDOW = 100
+# finite difference steps of get_climate_sensitivity, in the units of the task
+# inputs: °C, Pa and cm
+SENSITIVITY_STEPS = {"cableTemperature": 1.0, "windPressure": 10.0, "iceThickness": 0.1}
+# obstacles: side (m) of the grid cells they are bucketed in, and distance (m)
+# beyond which they are ignored by the clearance of a span
+OBSTACLE_CELL_SIZE = 25.0
+OBSTACLE_MAX_DISTANCE = 50.0
+# obstacle-segment distances computed at once by get_obstacle_clearances
+CLEARANCE_CHUNK_SIZE = 2**18
 
 
 @dataclass
@@ -86,134 +129,933 @@ class Cable:
     has_magnetic_heart: bool
 
 
+class CachedDataArray:
+    # mechaphlowers arrays rebuild a unit converted copy of their data on every
+    # `data` access, and BalanceEngine reads it dozens of times while building its
+    # models. Call touch() after editing data_original in place.
+    revision = 0
+    _data_cache = None
+
+    def cache_key(self):
+        return self.revision
+
+    def touch(self):
+        self.revision += 1
+
+    def add_units(self, input_units: dict[str, str]):
+        super().add_units(input_units)
+        self.touch()
+
+    @property
+    def data(self) -> pd.DataFrame:
+        key = self.cache_key()
+        if self._data_cache is None or self._data_cache[0] != key:
+            self._data_cache = (key, super().data)
+        return self._data_cache[1]
+
+
+class CachedCableArray(CachedDataArray, CableArray):
+    pass
+
+
+class CachedSectionArray(CachedDataArray, SectionArray):
+    def cache_key(self):
+        return (self.revision, self.sagging_parameter, self.sagging_temperature)
+
+
+class ChordBalanceSolver(BalanceSolver):
+    # Newton solver reusing its jacobian between iterations and between solves
+    # (chord method). The jacobian costs 2 model updates per support, it is only
+    # recomputed when the residual stalls, which suits re-solves from a nearby state.
+    # When that fails (large moves), it solves again from the starting position
+    # with a fresh jacobian at every iteration, like BalanceSolver.
+    # iterations, jacobian_evaluations and residual describe the last solve.
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.last_jacobian: Optional[np.ndarray] = None
+        self.iterations = 0
+        self.jacobian_evaluations = 0
+        self.residual = math.nan
+
+    def solve(self, model):
+        self.iterations = 0
+        self.jacobian_evaluations = 0
+        initial_state = model.state_vector.copy()
+        try:
+            self.iterate(model, newton=False)
+        except ValueError as error:
+            print(f"chord solver failed, retrying with newton iterations: {error}")
+            model.state_vector = initial_state
+            self.iterate(model, newton=True)
+
+    def iterate(self, model, newton: bool):
+        model.update()
+        objective_vector = model.objective_function()
+        self.residual = float(np.linalg.norm(objective_vector))
+        jacobian = None if newton else self.last_jacobian
+        self.last_jacobian = None
+        # True while using the jacobian of a previous solve
+        reused = jacobian is not None
+        for counter in range(1, self.max_iter):
+            if jacobian is None or jacobian.shape[0] != objective_vector.shape[0]:
+                jacobian = self.jacobian(objective_vector, model, self.perturb)
+                self.jacobian_evaluations += 1
+                reused = False
+            mem = self.residual
+            correction = np.linalg.solve(jacobian.T, objective_vector)
+            model.state_vector = model.state_vector - correction * (
+                1 - self.relax_ratio ** (counter**self.relax_power)
+            )
+            model.update()
+            objective_vector = model.objective_function()
+            self.iterations += 1
+            self.residual = float(np.linalg.norm(objective_vector))
+            if np.abs(self.residual**2 - mem**2) < self.stop_condition:
+                break
+            if counter == self.max_iter - 1:
+                raise ValueError("Balance solver did not converge")
+            # the first corrections are damped by the relaxation, afterwards a
+            # jacobian from a distant state shows as a residual shrinking slowly
+            stalled = reused and counter >= 3 and self.residual > mem / 2
+            if newton or stalled or self.residual > mem:
+                jacobian = None
+        self.last_jacobian = jacobian
+
+
+def read_support_columns(columns: dict) -> dict:
+    # one entry per support field, typed arrays arrive as memoryviews or lists,
+    # missing values as NaN or None
+    uuids = list(columns["uuid"])
+    names = columns.get("name")
+    support_columns = {
+        "uuid": uuids,
+        "name": list(names) if names is not None else [None] * len(uuids),
+    }
+    for field in SUPPORT_NUMERIC_FIELDS:
+        support_columns[field] = np.array(columns[field], dtype=np.float64)
+    return support_columns
+
+
+def support_columns_from_rows(supports: list) -> dict:
+    # supports given one by one, as dicts or Support objects
+    rows = [
+        vars(support) if isinstance(support, Support) else support
+        for support in supports
+    ]
+    return read_support_columns(
+        {
+            field: [row.get(field) for row in rows]
+            for field in ("uuid", "name", *SUPPORT_NUMERIC_FIELDS)
+        }
+    )
+
+
+def generate_section_data(support_columns: dict) -> pd.DataFrame:
+    support_count = len(support_columns["uuid"])
+    suspension = np.ones(support_count, dtype=bool)
+    suspension[:1] = False
+    suspension[-1:] = False
+    chain_length = support_columns["chainLength"]
+    return pd.DataFrame(
+        {
+            "name": [
+                name or f"Support {index}"
+                for index, name in enumerate(support_columns["name"])
+            ],
+            "suspension": suspension,
+            "conductor_attachment_altitude": support_columns["attachmentHeight"],
+            "crossarm_length": np.nan_to_num(support_columns["armLength"], nan=0),
+            # missing or zero chain length
+            "insulator_length": np.where(
+                np.isnan(chain_length) | (chain_length == 0), 1, chain_length
+            ),
+            "insulator_mass": np.nan_to_num(support_columns["chainWeight"], nan=0),
+            "load_mass": np.zeros(support_count),
+            "load_position": np.zeros(support_count),
+            "span_length": support_columns["spanLength"],
+            "line_angle": support_columns["spanAngle"],
+            "ground_altitude": support_columns["supportFootAltitude"],
+        }
+    )
+
+
 def generate_section_array(supports: list[Support]):
     # Generate a SectionArray
-    name = []
-    suspension = []
-    altitude = []
-    crossarm_length = []
-    line_angle = []
-    insulator_length = []
-    span_length = []
-    insulator_mass = []
-    load_mass = []
-    load_position = []
-    ground_altitude = []
-
-    for index, support in enumerate(supports):
-        name.append(support.name or f"Support {index}")
-        if index == 0 or index == len(supports) - 1:
-            suspension.append(False)
+    return generate_section_data(support_columns_from_rows(supports))
+
+
+class ObstacleIndex:
+    """Obstacle points bucketed in a uniform grid of the horizontal plane.
+
+    Points are given in the section frame of the spans. They are sorted by grid
+    cell: the points of cell cells[i] are points[starts[i] : starts[i + 1]], and
+    order maps them back to their input index.
+    """
+
+    def __init__(
+        self,
+        points: np.ndarray,
+        uuids: list,
+        types: list,
+        cell_size: float = OBSTACLE_CELL_SIZE,
+    ):
+        points = np.asarray(points, dtype=np.float64).reshape(-1, 3)
+        if np.isnan(points).any():
+            raise ValueError("obstacle coordinates must not be NaN")
+        self.uuids = uuids
+        self.types = types
+        self.cell_size = float(cell_size)
+        self.origin = points[:, :2].min(axis=0) if len(points) else np.zeros(2)
+        cell_xy = self.cell_xy(points[:, :2])
+        # cells per row, cell ids are row-major
+        self.shape = cell_xy.max(axis=0, initial=0) + 1
+        cell_ids = cell_xy[:, 0] * self.shape[1] + cell_xy[:, 1]
+        self.order = np.argsort(cell_ids, kind="stable")
+        self.points = points[self.order]
+        self.cells, starts = np.unique(cell_ids[self.order], return_index=True)
+        self.starts = np.append(starts, points.shape[0])
+
+    def __len__(self):
+        return self.points.shape[0]
+
+    @property
+    def nbytes(self) -> int:
+        return (
+            self.points.nbytes
+            + self.order.nbytes
+            + self.cells.nbytes
+            + self.starts.nbytes
+            + 64 * len(self.uuids)
+        )
+
+    def cell_xy(self, xy: np.ndarray) -> np.ndarray:
+        return np.floor((xy - self.origin) / self.cell_size).astype(np.int64)
+
+    def query_boxes(
+        self, lower: np.ndarray, upper: np.ndarray
+    ) -> tuple[np.ndarray, np.ndarray]:
+        # (box, point) pairs of the points in the cells overlapping each box, given
+        # by its (x, y) lower and upper corners; points may be outside of the box
+        if not len(self):
+            return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+        box_count = lower.shape[0]
+        low = np.clip(self.cell_xy(lower), 0, self.shape - 1)
+        high = np.clip(self.cell_xy(upper), 0, self.shape - 1)
+        outside = np.any(upper < self.origin, axis=1) | np.any(
+            lower >= self.origin + self.shape * self.cell_size, axis=1
+        )
+        rows = np.where(outside, 0, high[:, 0] - low[:, 0] + 1)
+        columns = high[:, 1] - low[:, 1] + 1
+        # every cell of every box, then the non-empty ones
+        box = np.repeat(np.arange(box_count), rows * columns)
+        rank = np.arange(box.shape[0]) - np.repeat(
+            np.cumsum(rows * columns) - rows * columns, rows * columns
+        )
+        cell_ids = (low[box, 0] + rank // columns[box]) * self.shape[1] + (
+            low[box, 1] + rank % columns[box]
+        )
+        position = np.minimum(
+            np.searchsorted(self.cells, cell_ids), self.cells.shape[0] - 1
+        )
+        found = self.cells[position] == cell_ids
+        box, position = box[found], position[found]
+        counts = self.starts[position + 1] - self.starts[position]
+        first = np.repeat(self.starts[position], counts)
+        rank = np.arange(first.shape[0]) - np.repeat(np.cumsum(counts) - counts, counts)
+        return np.repeat(box, counts), first + rank
+
+
+def read_obstacle_columns(columns: dict, cell_size: float) -> ObstacleIndex:
+    # typed arrays arrive as memoryviews or lists, like the support columns
+    points = np.stack(
+        [np.asarray(columns[axis], dtype=np.float64) for axis in ("x", "y", "z")],
+        axis=-1,
+    )
+    uuids = list(columns["uuid"])
+    types = columns.get("type")
+    types = list(types) if types is not None else [None] * len(uuids)
+    return ObstacleIndex(points, uuids, types, cell_size)
+
+
+def get_obstacle_distances(
+    spans: np.ndarray, obstacles: np.ndarray, pair_spans: np.ndarray
+) -> tuple[np.ndarray, np.ndarray]:
+    # distance from each obstacle to the polyline of its span, and the closest
+    # point of the polyline; spans are (span, point, xyz) without NaN
+    start = spans[pair_spans, :-1]
+    direction = spans[pair_spans, 1:] - start
+    relative = obstacles[:, np.newaxis] - start
+    length = np.einsum("psk,psk->ps", direction, direction)
+    ratio = np.clip(
+        np.einsum("psk,psk->ps", relative, direction) / np.maximum(length, 1e-12),
+        0,
+        1,
+    )
+    closest = start + ratio[..., np.newaxis] * direction
+    distance = np.linalg.norm(closest - obstacles[:, np.newaxis], axis=-1)
+    segment = np.argmin(distance, axis=1)
+    pairs = np.arange(obstacles.shape[0])
+    return distance[pairs, segment], closest[pairs, segment]
+
+
+@dataclass
+class SplitPoints:
+    # span i is points[offsets[i] : offsets[i + 1]]
+    points: np.ndarray
+    offsets: np.ndarray
+
+    def spans(self) -> List[np.ndarray]:
+        offsets = self.offsets.tolist()
+        return [self.points[start:end] for start, end in zip(offsets, offsets[1:])]
+
+
+def split_points(data) -> SplitPoints:
+    # rows of NaN separate the spans, as in mechaphlowers stack_nan output
+    data = np.asarray(data, dtype=np.float64).reshape(-1, 3)
+    separators = np.isnan(data[:, 0]) & np.isnan(data[:, 1]) & np.isnan(data[:, 2])
+    points = np.compress(~separators, data, axis=0)
+    # each separator ends a span at the number of points kept before it
+    positions = np.flatnonzero(separators)
+    ends = positions - np.arange(positions.shape[0])
+    if data.shape[0] and not separators[-1]:
+        ends = np.append(ends, points.shape[0])
+    return SplitPoints(points=points, offsets=np.concatenate([[0], ends]))
+
+
+def split_points_into_their_spans(data) -> List[np.ndarray]:
+    return split_points(data).spans()
+
+
+mock_data = """"""
+
+
+@dataclass
+class SectionSession:
+    key: str
+    engine: BalanceEngine
+    plt_line: PlotEngine
+    size: int
+    # (ice_thickness, new_temperature, wind_pressure) of the last solve_change_state,
+    # None when the engine state is unknown (e.g. after a failed solve)
+    climate: Optional[tuple] = None
+    # bumped by every solve, derived outputs are cached for a given version
+    version: int = 0
+    derived: Optional[dict] = None
+    derived_version: int = -1
+    # support columns, cable and initial condition the session key was computed from
+    inputs: Optional[dict] = None
+    # chains position after the last adjustment, used to warm start the next one
+    adjustment_state: Optional[np.ndarray] = None
+    # solvers keeping their jacobian between incremental re-solves
+    adjustment_solver: Optional["ChordBalanceSolver"] = None
+    change_state_solver: Optional["ChordBalanceSolver"] = None
+    # convergence of the last solve_climate, see solve_climate
+    solver_stats: Optional[dict] = None
+    # obstacles around the section, see set_obstacles
+    obstacles: Optional[ObstacleIndex] = None
+
+
+class SessionRegistry:
+    """LRU registry of solved sections, evicted under a memory budget."""
+
+    def __init__(self, max_bytes: int = SESSION_CACHE_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self.total_size = 0
+        self._sessions: OrderedDict[str, SectionSession] = OrderedDict()
+
+    def __len__(self):
+        return len(self._sessions)
+
+    def __contains__(self, key: str):
+        return key in self._sessions
+
+    def get(self, key: str) -> Optional[SectionSession]:
+        session = self._sessions.get(key)
+        if session is not None:
+            self._sessions.move_to_end(key)
+        return session
+
+    def put(self, session: SectionSession):
+        self.pop(session.key)
+        self._sessions[session.key] = session
+        self.total_size += session.size
+        self.evict()
+
+    def resize(self, session: SectionSession, size: int):
+        # solves change the size of a session (solver jacobians), the budget is
+        # checked again when it is registered
+        if self._sessions.get(session.key) is session:
+            self.total_size += size - session.size
+            session.size = size
+            self.evict()
         else:
-            suspension.append(True)
-        altitude.append(support.attachmentHeight)
-        crossarm_length.append(support.armLength or 0)
-        insulator_length.append(support.chainLength or 1)
-        span_length.append(support.spanLength)
-        line_angle.append(support.spanAngle)
-        insulator_mass.append(support.chainWeight or 0)
-        load_mass.append(0)
-        load_position.append(0)
-        ground_altitude.append(support.supportFootAltitude)
-
-    section_data = {
-        "name": name,
-        "suspension": suspension,
-        "conductor_attachment_altitude": altitude,
-        "crossarm_length": crossarm_length,
-        "insulator_length": insulator_length,
-        "insulator_mass": insulator_mass,
-        "load_mass": load_mass,
-        "load_position": load_position,
-        "span_length": span_length,
-        "line_angle": line_angle,
-        "ground_altitude": ground_altitude,
-    }
-    return pd.DataFrame(section_data)
+            session.size = size
+
+    def pop(self, key: str) -> Optional[SectionSession]:
+        session = self._sessions.pop(key, None)
+        if session is not None:
+            self.total_size -= session.size
+        return session
+
+    def evict(self):
+        # the most recently used session is always kept, even if it exceeds the budget alone
+        while self.total_size > self.max_bytes and len(self._sessions) > 1:
+            _, session = self._sessions.popitem(last=False)
+            self.total_size -= session.size
+
+    def clear(self):
+        self._sessions.clear()
+        self.total_size = 0
+
+
+class TaskTimings:
+    """Rolling statistics of the phase durations (ms) of the last task runs."""
 
+    def __init__(self, window: int = TIMING_WINDOW):
+        self.window = window
+        self._runs: dict[str, deque] = {}
 
-def add_obstacle(df, x, y, z, type_obstacle, name_obstacle, support):
-    df.x.cumsum()
-    new_df = pd.DataFrame(
+    def record(self, task: str, timings: dict):
+        self._runs.setdefault(task, deque(maxlen=self.window)).append(timings)
+
+    def statistics(self) -> dict:
+        statistics = {}
+        for task, runs in self._runs.items():
+            phases = {}
+            # phases in the order they first ran
+            for phase in dict.fromkeys(name for run in runs for name in run):
+                durations = np.array([run[phase] for run in runs if phase in run])
+                phases[phase] = {
+                    "count": int(durations.shape[0]),
+                    "last": float(durations[-1]),
+                    "mean": float(durations.mean()),
+                    "median": float(np.median(durations)),
+                    "p95": float(np.percentile(durations, 95)),
+                    "max": float(durations.max()),
+                }
+            statistics[task] = {"runs": len(runs), "phases": phases}
+        return statistics
+
+    def clear(self):
+        self._runs.clear()
+
+
+def section_session_key(
+    support_columns: dict, cable: dict, initial_condition: Optional[dict]
+) -> str:
+    payload = json.dumps(
         {
-            "x": [x],
-            "y": [y],
-            "z": [z],
-            "type": [type_obstacle],
-            "support": [support],
-            "section": ["obstacle"],
-        }
+            "supports": {
+                "uuid": support_columns["uuid"],
+                "name": support_columns["name"],
+            },
+            "cable": cable,
+            "initial_condition": initial_condition,
+        },
+        sort_keys=True,
+        default=str,
     )
-    return pd.concat([df, new_df], ignore_index=True)
+    digest = hashlib.sha256(payload.encode("utf-8"))
+    for field in SUPPORT_NUMERIC_FIELDS:
+        digest.update(support_columns[field].tobytes())
+    return digest.hexdigest()
 
 
-def split_points_into_their_spans(data: List[List[float]]) -> List[List[List[float]]]:
-    spans = []
-    new_span = []
-    for row in data:
-        if math.isnan(row[0]) and math.isnan(row[1]) and math.isnan(row[2]):
-            spans.append(new_span)
-            new_span = []
+def estimate_session_size(session: SectionSession) -> int:
+    # rough footprint: input dataframes, the per-span arrays kept by the
+    # span/balance models, the plot points (x and z at RESOLUTION per span), the
+    # jacobians kept by the solvers and the obstacles. A jacobian has 2 rows and
+    # columns per support: it dominates for large sections (32 MB at 1000 supports)
+    engine = session.engine
+    size = int(engine.section_array.data_original.memory_usage(deep=True).sum())
+    size += int(engine.cable_array.data_original.memory_usage(deep=True).sum())
+    size += engine.support_number * 64 * 8
+    section_pts = session.plt_line.section_pts
+    for name in ("x_cable", "z_cable"):
+        points = getattr(section_pts, name, None)
+        if isinstance(points, np.ndarray):
+            size += points.nbytes
         else:
-            new_span.append(row)
-    return spans
+            size += engine.support_number * RESOLUTION * 8
+    for solver in (session.adjustment_solver, session.change_state_solver):
+        if solver is not None and solver.last_jacobian is not None:
+            size += solver.last_jacobian.nbytes
+    if session.obstacles is not None:
+        size += session.obstacles.nbytes
+    return size
 
 
-mock_data = """"""
+def use_change_state_solver(session: SectionSession):
+    # successive climate changes start from the last solved chains position, the
+    # chord solver keeps its jacobian between them
+    if session.change_state_solver is None:
+        session.change_state_solver = ChordBalanceSolver(
+            **mph.options.solver.balance_solver_change_state_params
+        )
+    session.engine.solver_change_state = session.change_state_solver
+
+
+def solve_adjustment(session: SectionSession):
+    session.version += 1
+    with timed_phase("solve_adjustment"):
+        session.engine.solve_adjustment()
+    session.adjustment_state = session.engine.balance_model.state_vector.copy()
+
+
+def climate_values(climate: Optional[tuple]) -> np.ndarray:
+    # (ice_thickness, new_temperature, wind_pressure) with engine defaults for None
+    defaults = BalanceEngine.default_value
+    climate = climate or (None, None, None)
+    return np.array(
+        [
+            defaults[name] if value is None else value
+            for name, value in zip(
+                ("ice_thickness", "new_temperature", "wind_pressure"), climate
+            )
+        ],
+        dtype=np.float64,
+    )
+
+
+def solve_climate(
+    session: SectionSession,
+    ice_thickness=None,
+    new_temperature=None,
+    wind_pressure=None,
+    steps: int = 1,
+) -> dict:
+    # Solves from the current chains position. With steps > 1, the climate moves
+    # linearly from the last solved one to the target in `steps` solves
+    # (continuation), which helps the solver on large moves.
+    start = time.perf_counter()
+    target = (ice_thickness, new_temperature, wind_pressure)
+    previous = session.climate
+    session.version += 1
+    session.climate = None
+    solver = session.change_state_solver
+    stats = {
+        "iterations": 0,
+        "jacobian_evaluations": 0,
+        "residual": math.nan,
+        "max_iterations": solver.max_iter if solver else None,
+        "steps": 0,
+        "wall_time": 0.0,
+    }
+    session.solver_stats = stats
+    steps = max(1, int(steps)) if previous is not None else 1
+    start_values = climate_values(previous)
+    target_values = climate_values(target)
+    balance_model = session.engine.balance_model
+    # chains position of the last converged step
+    state_vector = balance_model.state_vector.copy()
+    try:
+        for step in range(1, steps + 1):
+            if step == steps:
+                climate = target
+            else:
+                climate = tuple(
+                    float(value)
+                    for value in start_values
+                    + (target_values - start_values) * step / steps
+                )
+            with timed_phase("solve_change_state"):
+                session.engine.solve_change_state(
+                    ice_thickness=climate[0],
+                    new_temperature=climate[1],
+                    wind_pressure=climate[2],
+                )
+            state_vector = balance_model.state_vector.copy()
+            stats["steps"] = step
+            if solver:
+                stats["iterations"] += solver.iterations
+                stats["jacobian_evaluations"] += solver.jacobian_evaluations
+                stats["residual"] = solver.residual
+    except ValueError:
+        # the next solve starts from the last converged position, not from where
+        # the failed iterations stopped
+        balance_model.state_vector = state_vector
+        raise
+    finally:
+        if solver:
+            # a failed solve leaves the counters of the failing step
+            stats["residual"] = solver.residual
+        stats["wall_time"] = time.perf_counter() - start
+        sessions.resize(session, estimate_session_size(session))
+    session.climate = target
+    return stats
 
 
+sessions = SessionRegistry()
+active_session: Optional[SectionSession] = None
 engine = None
 plt_line = None
+task_timings = TaskTimings()
+# phase durations of the running task, None outside of a task
+current_timings: Optional[dict] = None
+
+
+@contextmanager
+def timed_phase(name: str):
+    # adds the duration of the block to the phase of the running task
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        if current_timings is not None:
+            duration = (time.perf_counter() - start) * 1000
+            current_timings[name] = current_timings.get(name, 0.0) + duration
+
+
+def timed_task(function):
+    # Task results get the duration (ms) of their phases in "timings", with the
+    # whole python function in "total". They are also kept in task_timings.
+    def start() -> tuple:
+        global current_timings
+        previous = current_timings
+        current_timings = {}
+        return previous, time.perf_counter()
+
+    def stop(started: tuple, result=None, failed: bool = False):
+        global current_timings
+        previous, start_time = started
+        timings = current_timings
+        current_timings = previous
+        timings["total"] = (time.perf_counter() - start_time) * 1000
+        if failed:
+            return result
+        task_timings.record(function.__name__, timings)
+        if isinstance(result, dict):
+            result["timings"] = timings
+        return result
+
+    if inspect.isgeneratorfunction(function):
+
+        @functools.wraps(function)
+        def generator_wrapper(*args):
+            started = start()
+            try:
+                result = yield from function(*args)
+            except BaseException:
+                stop(started, failed=True)
+                raise
+            return stop(started, result)
+
+        return generator_wrapper
+
+    @functools.wraps(function)
+    def wrapper(*args):
+        started = start()
+        try:
+            result = function(*args)
+        except BaseException:
+            stop(started, failed=True)
+            raise
+        return stop(started, result)
+
+    return wrapper
+
+
+def activate_session(session: SectionSession):
+    global active_session, engine, plt_line
+    active_session = session
+    engine = session.engine
+    plt_line = session.plt_line
 
 
 def get_section_middle_span(start_support: int, end_support: int):
     return (start_support + end_support) // 2
 
 
+def pack_buffers(arrays: dict[str, np.ndarray], precision: str = "float64") -> dict:
+    # concatenate every array into one contiguous buffer: toJs hands it over as a
+    # single typed array, and the JS side slices views out of it using the layout
+    layout = {}
+    offset = 0
+    for name, array in arrays.items():
+        layout[name] = {"offset": offset, "shape": list(np.shape(array))}
+        offset += int(np.size(array))
+    buffer = np.empty(offset, dtype=np.dtype(precision))
+    for name, array in arrays.items():
+        start = layout[name]["offset"]
+        buffer[start : start + np.size(array)] = np.ravel(array)
+    return {"buffer": buffer, "precision": buffer.dtype.name, "layout": layout}
+
+
+def get_derived_arrays(session: SectionSession) -> dict[str, np.ndarray]:
+    # physics outputs only change with a solve, projection and view changes reuse them
+    if session.derived_version == session.version:
+        return session.derived
+    engine = session.engine
+    section_data = engine.section_array.data
+    vhl_under_chain = engine.balance_model.vhl_under_chain()
+    vhl_under_console = engine.balance_model.vhl_under_console()
+    session.derived = {
+        "L0": engine.L_ref,
+        "elevation": section_data.elevation_difference.to_numpy(),
+        "line_angle": section_data.line_angle.to_numpy(),
+        "vhl_under_chain": vhl_under_chain.vhl_matrix.value,
+        "vhl_under_console": vhl_under_console.vhl_matrix.value,
+        "r_under_chain": vhl_under_chain.R.value,
+        "r_under_console": vhl_under_console.R.value,
+        "ground_altitude": section_data.ground_altitude.to_numpy(),
+        "displacement": engine.get_displacement(),
+        "load_angle": engine.cable_loads.load_angle,
+        "span_length": section_data.span_length.to_numpy(),
+    }
+    session.derived_version = session.version
+    return session.derived
+
+
+def get_lod_point_counts(section_pts: SectionPoints, lod: dict) -> np.ndarray:
+    # A segment of length h on a curve of curvature k is at most k * h**2 / 8 away
+    # from it. A catenary is most curved at its lowest point, k = 1 / parameter,
+    # so the point spacing follows from the tolerance and the sagging parameter.
+    span_model = section_pts.span_model
+    length = span_model.compute_x_n() - span_model.compute_x_m()
+    spacing = np.sqrt(
+        8 * lod.get("tolerance", LOD_TOLERANCE) * span_model.sagging_parameter
+    )
+    with np.errstate(invalid="ignore"):
+        counts = np.ceil(np.abs(length) / spacing) + 1
+    counts = np.clip(
+        np.nan_to_num(counts, nan=LOD_MIN_POINTS), LOD_MIN_POINTS, RESOLUTION
+    )
+    counts = counts.astype(int)
+    # only the spans explicitly inspected keep the full resolution, none by
+    # default: the whole section is a coarse preview
+    if "startSupport" in lod or "endSupport" in lod:
+        start = lod.get("startSupport", 0)
+        end = lod.get("endSupport", len(counts))
+        counts[start:end] = RESOLUTION
+    return counts
+
+
+def get_window_bounds(
+    support_number: int, start_support: int, end_support: int, window: dict
+) -> tuple[int, int]:
+    # first and last support returned, the margin keeps the neighbouring spans
+    # ready when the view is panned
+    margin = window.get("margin", WINDOW_MARGIN)
+    start = window.get("startSupport", start_support)
+    end = window.get("endSupport", end_support)
+    return max(0, start - margin), min(support_number - 1, end + margin)
+
+
+def get_span_points(
+    section_pts: SectionPoints, counts: np.ndarray, first: int, last: int
+) -> np.ndarray:
+    # same as SectionPoints.get_spans("section").coords for the spans between
+    # supports first and last, with counts[i] points on span i: spans are sampled
+    # on a grid of max(counts) rows, the shorter ones repeating their last point
+    span_model = section_pts.span_model
+    x_m = span_model.compute_x_m()
+    x_n = span_model.compute_x_n()
+    window = slice(first, last)
+    ratio = np.minimum(
+        np.arange(counts[window].max(initial=1))[:, np.newaxis]
+        / np.maximum(counts - 1, 1),
+        1,
+    )
+    x_cable = x_m + (x_n - x_m) * ratio
+    z_cable = span_model.z_many_points(x_cable)
+    plane = section_pts.plane
+    x, y, z = cable_to_beta_plane(
+        x_cable[:, window],
+        z_cable[:, window],
+        section_pts.beta[window],
+        plane.a_chain[window],
+        plane.b_chain[window],
+    )
+    x, y, z = cable_to_localsection_frame(x, y, z, plane.azimuth_angle[window])
+    x, y, z = translate_cable_to_support_from_attachments(
+        x, y, z, section_pts.get_attachments_coords()[first : last + 1]
+    )
+    return Points.from_vectors(x, y, z).coords
+
+
 def get_coordinates(
     plt_line: PlotEngine,
     project: bool = False,
     start_support: int = 0,
     end_support: int = 0,
+    output_format: str = "lists",
+    precision: str = "float64",
+    lod: Optional[dict] = None,
+    window: Optional[dict] = None,
 ):
     middle_span = get_section_middle_span(start_support, end_support)
-    span, supports, insulators = plt_line.section_pts.get_points_for_plot(
-        project=project, frame_index=middle_span
-    )
-    vhl_under_chain = list(engine.balance_model.vhl_under_chain().vhl)
-    vhl_under_console = list(engine.balance_model.vhl_under_console().vhl)
-    # vhl = vhl_under_chain.vhl)
-    result = {
+    section_pts = plt_line.section_pts
+    support_number = section_pts.line_angle.shape[0]
+    first, last = 0, support_number - 1
+    if window is not None:
+        first, last = get_window_bounds(
+            support_number, start_support, end_support, window
+        )
+    with timed_phase("get_points_for_plot"):
+        span_counts = None
+        if lod is None and window is None:
+            span, supports, insulators = section_pts.get_points_for_plot(
+                project=project, frame_index=middle_span
+            )
+        else:
+            counts = np.full(support_number, RESOLUTION)
+            if lod is not None:
+                counts = get_lod_point_counts(section_pts, lod)
+                span_counts = counts[first:last]
+            span = Points(get_span_points(section_pts, counts, first, last))
+            supports = section_pts.get_supports()
+            insulators = section_pts.get_insulators()
+            if project:
+                # the projection frame is taken from the whole section supports
+                span, supports, insulators = section_pts.project_to_selected_frame(
+                    span, supports, insulators, middle_span
+                )
+            supports.coords = supports.coords[first : last + 1]
+            insulators.coords = insulators.coords[first : last + 1]
+    with timed_phase("derived_arrays"):
+        derived_arrays = get_derived_arrays(active_session)
+    arrays = {
         "spans": span.coords,
         "insulators": insulators.coords,
         "supports": supports.coords,
-        "L0": engine.L_ref.tolist(),
-        "elevation": engine.section_array.data.elevation_difference.tolist(),
-        "line_angle": engine.section_array.data.line_angle.tolist(),
-        "vhl_under_chain": [v.value.tolist() for v in vhl_under_chain],
-        "vhl_under_console": [v.value.tolist() for v in vhl_under_console],
-        "r_under_chain": engine.balance_model.vhl_under_chain().R.value.tolist(),
-        "r_under_console": engine.balance_model.vhl_under_console().R.value.tolist(),
-        "ground_altitude": engine.section_array.data.ground_altitude.tolist(),
-        "displacement": engine.get_displacement().tolist(),
-        "load_angle": engine.cable_loads.load_angle.tolist(),
-        "span_length": engine.section_array.data.span_length.tolist(),
+        **derived_arrays,
     }
+    if span_counts is not None:
+        # spans have different point counts: drop the padding, buffers store them
+        # one after the other with span_offsets[i]:span_offsets[i + 1] for span i
+        spans = [points[:count] for points, count in zip(arrays["spans"], span_counts)]
+        arrays["spans"] = spans
+        if output_format == "buffers":
+            arrays["spans"] = np.concatenate(spans)
+            arrays["span_offsets"] = np.concatenate([[0], np.cumsum(span_counts)])
+    with timed_phase("output"):
+        if output_format == "buffers":
+            result = pack_buffers(arrays, precision)
+        else:
+            result = {
+                name: value.tolist() if isinstance(value, np.ndarray) else value
+                for name, value in arrays.items()
+            }
+            for name in ("spans", "insulators", "supports"):
+                result[name] = arrays[name]
+    if window is not None:
+        # spans, insulators and supports start at support `startSupport`, the
+        # other outputs still cover the whole section
+        result["window"] = {"startSupport": first, "endSupport": last}
     return result
 
 
-def init_section(js_inputs: dict):
-    global engine, plt_line
-    python_inputs = js_inputs.to_py()
-    print("python_inputs: ", python_inputs)
-    # import json
+def to_py(js_inputs) -> dict:
+    # tasks get a JsProxy in the web worker, plain dicts when run from CPython
+    if hasattr(js_inputs, "to_py"):
+        with timed_phase("to_py"):
+            return js_inputs.to_py()
+    return js_inputs
 
-    # js_inputs2 = globals()["js_inputs"].to_py()
-    # js_inputs = json.loads(mock_data)
-    # js_inputs = globals()["js_inputs"].to_py()
-    # print("js_inputs: ", json.dumps(js_inputs))
-    input_section = python_inputs["section"]
-    input_cable = python_inputs["cable"]
+
+def get_output_options(python_inputs: dict) -> dict:
+    return {
+        "output_format": python_inputs.get("outputFormat", "lists"),
+        "precision": python_inputs.get("precision", "float64"),
+        "lod": python_inputs.get("lod"),
+        "window": python_inputs.get("window"),
+    }
+
+
+def build_section_session(
+    key: str,
+    support_columns: dict,
+    initial_condition: Optional[InitialCondition],
+    cable: Cable,
+) -> SectionSession:
+    # np.random.seed(142)
+    with timed_phase("section_array"):
+        df = generate_section_data(support_columns)
+        mph.options.graphics.resolution = RESOLUTION
+
+        section = CachedSectionArray(df)
+        # set sagging parameter and temperatur
+        if initial_condition:
+            section.sagging_parameter = initial_condition.base_parameters
+        # print("initial_condition: ", initial_condition)
+        section.sagging_temperature = (
+            initial_condition.base_temperature if initial_condition else 15
+        )
+
+    # cable_array = sample_cable_catalog.get_as_object([cable.name])
+
+    with timed_phase("cable_array"):
+        cable_array = CachedCableArray(
+            pd.DataFrame(
+                {
+                    "section": [cable.section],
+                    "diameter": [cable.diameter],
+                    "linear_mass": [cable.linear_mass],
+                    "young_modulus": [cable.young_modulus],
+                    "dilatation_coefficient": [cable.dilatation_coefficient],
+                    "temperature_reference": [cable.temperature_reference],
+                    "a0": [cable.stress_strain_a0],
+                    "a1": [cable.stress_strain_a1],
+                    "a2": [cable.stress_strain_a2],
+                    "a3": [cable.stress_strain_a3],
+                    "a4": [cable.stress_strain_a4],
+                    "b0": [cable.stress_strain_b0],
+                    "b1": [cable.stress_strain_b1],
+                    "b2": [cable.stress_strain_b2],
+                    "b3": [cable.stress_strain_b3],
+                    "b4": [cable.stress_strain_b4],
+                    "diameter_heart": [cable.diameter_heart],
+                    "section_conductor": [cable.section_conductor],
+                    "section_heart": [cable.section_heart],
+                    "solar_absorption": [cable.solar_absorption],
+                    "emissivity": [cable.emissivity],
+                    "electric_resistance_20": [cable.electric_resistance_20],
+                    "linear_resistance_temperature_coef": [
+                        cable.linear_resistance_temperature_coef
+                    ],
+                    "radial_thermal_conductivity": [cable.radial_thermal_conductivity],
+                    "has_magnetic_heart": [cable.has_magnetic_heart],
+                    "is_polynomial": [cable.is_polynomial],
+                }
+            )
+        )
+        cable_array.add_units(
+            {
+                "young_modulus": "MPa",
+                "dilatation_coefficient": "1/K",
+                # "a0": "MPa",
+                # "a1": "MPa",
+                # "a2": "MPa",
+                # "a3": "MPa",
+                # "a4": "MPa",
+                # "b0": "MPa",
+                # "b1": "MPa",
+                # "b2": "MPa",
+                # "b3": "MPa",
+                # "b4": "MPa",
+            }
+        )
+    # print("cable_array: ", json.dumps(cable_array.data.to_dict()))
+
+    with timed_phase("engine"):
+        engine = BalanceEngine(cable_array=cable_array, section_array=section)
+        plt_line = PlotEngine.builder_from_balance_engine(engine)
+    session = SectionSession(
+        key=key,
+        engine=engine,
+        plt_line=plt_line,
+        size=0,
+    )
+    use_change_state_solver(session)
+    solve_adjustment(session)
+    session.size = estimate_session_size(session)
+    return session
+
+
+def load_section(
+    input_section: dict, input_cable: dict, input_support_columns: Optional[dict]
+) -> Optional[SectionSession]:
+    # solved session of the section in its selected charge, None without supports
     input_initial_conditions = input_section["initial_conditions"]
     input_initial_condition = (
         None
@@ -250,115 +1092,156 @@ def init_section(js_inputs: dict):
     # del input_cable["has_magnetic_heart"]
     cable = Cable(**input_cable)
 
-    if not input_section["supports"]:
-        return {"error": "No supports data provided"}
+    # supports come either as columns (one typed array per field) or one by one
+    if input_support_columns is not None:
+        support_columns = read_support_columns(input_support_columns)
+    else:
+        support_columns = support_columns_from_rows(input_section.get("supports", []))
+    if not support_columns["uuid"]:
+        return None
 
-    # Extract supports data from JavaScript inputs
-    supports_data = []
-    for support_js in input_section["supports"]:
-        supports_data.append(Support(**support_js))
-    # np.random.seed(142)
-    df = generate_section_array(supports_data)
-    mph.options.graphics.resolution = RESOLUTION
-
-    section = SectionArray(df)
-    # set sagging parameter and temperatur
-    if initial_condition:
-        section.sagging_parameter = initial_condition.base_parameters
-    # print("initial_condition: ", initial_condition)
-    section.sagging_temperature = (
-        initial_condition.base_temperature if initial_condition else 15
-    )
+    with timed_phase("session_key"):
+        key = section_session_key(support_columns, input_cable, input_initial_condition)
+    session = sessions.get(key)
+    if session is None:
+        session = build_section_session(key, support_columns, initial_condition, cable)
+        session.inputs = {
+            "supports": support_columns,
+            "cable": input_cable,
+            "initial_condition": input_initial_condition,
+        }
+        solve_climate(session)
+        sessions.put(session)
 
-    # cable_array = sample_cable_catalog.get_as_object([cable.name])
+    climate_kwargs = {}
+    if input_charge and "data" in input_charge and "climate" in input_charge["data"]:
+        climate = input_charge["data"]["climate"]
+        climate_kwargs = {
+            "ice_thickness": climate["iceThickness"],
+            "new_temperature": climate["cableTemperature"],
+            "wind_pressure": climate["windPressure"],
+        }
+    # a cached session may have been left in another climate by change_climate_load
+    if session.climate != (
+        climate_kwargs.get("ice_thickness"),
+        climate_kwargs.get("new_temperature"),
+        climate_kwargs.get("wind_pressure"),
+    ):
+        solve_climate(session, **climate_kwargs)
+    return session
 
-    cable_array = CableArray(
-        pd.DataFrame(
-            {
-                "section": [cable.section],
-                "diameter": [cable.diameter],
-                "linear_mass": [cable.linear_mass],
-                "young_modulus": [cable.young_modulus],
-                "dilatation_coefficient": [cable.dilatation_coefficient],
-                "temperature_reference": [cable.temperature_reference],
-                "a0": [cable.stress_strain_a0],
-                "a1": [cable.stress_strain_a1],
-                "a2": [cable.stress_strain_a2],
-                "a3": [cable.stress_strain_a3],
-                "a4": [cable.stress_strain_a4],
-                "b0": [cable.stress_strain_b0],
-                "b1": [cable.stress_strain_b1],
-                "b2": [cable.stress_strain_b2],
-                "b3": [cable.stress_strain_b3],
-                "b4": [cable.stress_strain_b4],
-                "diameter_heart": [cable.diameter_heart],
-                "section_conductor": [cable.section_conductor],
-                "section_heart": [cable.section_heart],
-                "solar_absorption": [cable.solar_absorption],
-                "emissivity": [cable.emissivity],
-                "electric_resistance_20": [cable.electric_resistance_20],
-                "linear_resistance_temperature_coef": [
-                    cable.linear_resistance_temperature_coef
-                ],
-                "radial_thermal_conductivity": [cable.radial_thermal_conductivity],
-                "has_magnetic_heart": [cable.has_magnetic_heart],
-                "is_polynomial": [cable.is_polynomial],
-            }
-        )
+
+@timed_task
+def init_section(js_inputs: dict):
+    python_inputs = to_py(js_inputs)
+    print("python_inputs: ", python_inputs)
+    # import json
+
+    # js_inputs2 = globals()["js_inputs"].to_py()
+    # js_inputs = json.loads(mock_data)
+    # js_inputs = globals()["js_inputs"].to_py()
+    # print("js_inputs: ", json.dumps(js_inputs))
+    session = load_section(
+        python_inputs["section"],
+        python_inputs["cable"],
+        python_inputs.get("supportColumns"),
     )
-    cable_array.add_units(
-        {
-            "young_modulus": "MPa",
-            "dilatation_coefficient": "1/K",
-            # "a0": "MPa",
-            # "a1": "MPa",
-            # "a2": "MPa",
-            # "a3": "MPa",
-            # "a4": "MPa",
-            # "b0": "MPa",
-            # "b1": "MPa",
-            # "b2": "MPa",
-            # "b3": "MPa",
-            # "b4": "MPa",
-        }
+    if session is None:
+        return {"error": "No supports data provided"}
+    activate_session(session)
+    return get_coordinates(
+        plt_line,
+        False,
+        0,
+        engine.support_number - 1,
+        **get_output_options(python_inputs),
     )
-    # print("cable_array: ", json.dumps(cable_array.data.to_dict()))
 
-    engine = BalanceEngine(cable_array=cable_array, section_array=section)
-    plt_line = PlotEngine.builder_from_balance_engine(engine)
-    engine.solve_adjustment()
-    engine.solve_change_state()
 
-    if input_charge and "data" in input_charge and "climate" in input_charge["data"]:
-        climate = input_charge["data"]["climate"]
-        engine.solve_change_state(
-            ice_thickness=climate["iceThickness"],
-            new_temperature=climate["cableTemperature"],
-            wind_pressure=climate["windPressure"],
-        )
-    section_length = len(engine.section_array.data)
-    return get_coordinates(plt_line, False, 0, section_length - 1)
+@timed_task
+def solve_sections(js_inputs: dict):
+    # Generator: yields the result of each section as soon as it is solved, and
+    # returns the timings and failures of the whole batch. Solved sections stay in
+    # the session registry, opening one of them afterwards is immediate.
+    python_inputs = to_py(js_inputs)
+    output_options = get_output_options(python_inputs)
+    previous_session = active_session
+    previous_climate = previous_session.climate if previous_session else None
+    start = time.perf_counter()
+    summary = []
+    try:
+        for index, item in enumerate(python_inputs["sections"]):
+            section_start = time.perf_counter()
+            result = None
+            error = None
+            try:
+                session = load_section(
+                    item["section"], item["cable"], item.get("supportColumns")
+                )
+                if session is None:
+                    error = "No supports data provided"
+                else:
+                    activate_session(session)
+                    result = get_coordinates(
+                        plt_line, False, 0, engine.support_number - 1, **output_options
+                    )
+            except Exception as exception:
+                print(f"section {index} failed: {exception}")
+                error = f"{type(exception).__name__}: {exception}"
+            status = {
+                "index": index,
+                "uuid": item["section"].get("uuid"),
+                "time": time.perf_counter() - section_start,
+                "error": error,
+            }
+            summary.append(status)
+            yield {**status, "result": result}
+    finally:
+        # leave the displayed section as it was, and the most recently used one:
+        # the batch must not get it evicted by the next resize
+        if previous_session is not None:
+            if sessions.get(previous_session.key) is not previous_session:
+                sessions.put(previous_session)
+            if (
+                previous_climate is not None
+                and previous_session.climate != previous_climate
+            ):
+                solve_climate(previous_session, *previous_climate)
+            activate_session(previous_session)
+    failed = sum(status["error"] is not None for status in summary)
+    return {
+        "sections": summary,
+        "solved": len(summary) - failed,
+        "failed": failed,
+        "total_time": time.perf_counter() - start,
+    }
 
 
+@timed_task
 def refresh_projection(js_inputs: dict):
     global plt_line
-    python_inputs = js_inputs.to_py()
+    python_inputs = to_py(js_inputs)
     start_support = python_inputs["startSupport"]
     end_support = python_inputs["endSupport"]
     view = python_inputs["view"]
-    return get_coordinates(plt_line, view == "2d", start_support, end_support)
+    return get_coordinates(
+        plt_line,
+        view == "2d",
+        start_support,
+        end_support,
+        **get_output_options(python_inputs),
+    )
 
 
+@timed_task
 def change_climate_load(js_inputs: dict):
     # import json
 
-    global engine, plt_line
-    python_inputs = js_inputs.to_py()
+    python_inputs = to_py(js_inputs)
     print("python_inputs: ", python_inputs)
     wind_pressure = python_inputs["windPressure"]
     cable_temperature = python_inputs["cableTemperature"]
     ice_thickness = python_inputs["iceThickness"] / 100  # in meters in the engine
-    section_length = len(engine.section_array.data)
     # print(
     #     "engine.section_array.data: ", json.dumps(engine.section_array.data.to_dict())
     # )
@@ -367,16 +1250,372 @@ def change_climate_load(js_inputs: dict):
     # print(
     #     "engine.section_array.data: ", json.dumps(engine.section_array.data.to_dict())
     # )
-    engine.solve_change_state(
+    solver_stats = solve_climate(
+        active_session,
         ice_thickness=ice_thickness,
         new_temperature=cable_temperature,
         wind_pressure=wind_pressure,
+        steps=python_inputs.get("steps", 1),
+    )
+    result = get_coordinates(plt_line, **get_output_options(python_inputs))
+    result["solver"] = solver_stats
+    return result
+
+
+# editable support fields and the SectionArray column they are stored in
+SUPPORT_FIELD_COLUMNS = {
+    "attachmentHeight": "conductor_attachment_altitude",
+    "spanLength": "span_length",
+    "chainLength": "insulator_length",
+}
+
+
+def rebuild_engine(
+    session: SectionSession,
+    climate: tuple,
+    state_vector: Optional[np.ndarray],
+    section_array: Optional[SectionArray] = None,
+):
+    if section_array is None:
+        section_array = session.engine.section_array
+    session.engine = BalanceEngine(
+        cable_array=session.engine.cable_array, section_array=section_array
+    )
+    session.plt_line = PlotEngine.builder_from_balance_engine(session.engine)
+    use_change_state_solver(session)
+    if state_vector is not None:
+        if session.adjustment_solver is None:
+            session.adjustment_solver = ChordBalanceSolver(
+                **mph.options.solver.balance_solver_adjustment_params
+            )
+        session.engine.solver_adjustment = session.adjustment_solver
+        session.engine.balance_model.state_vector = session.adjustment_state.copy()
+    solve_adjustment(session)
+    if state_vector is not None:
+        session.engine.balance_model.state_vector = state_vector.copy()
+    solve_climate(session, *climate)
+
+
+def patch_supports(session: SectionSession, support_patches: list) -> tuple:
+    # copies of the support columns and of the section data with the patches
+    # applied, the session is left as is until they are solved
+    support_columns = {
+        field: column.copy() for field, column in session.inputs["supports"].items()
+    }
+    section_data = session.engine.section_array.data_original.copy()
+    for support_patch in support_patches:
+        index = support_columns["uuid"].index(support_patch["uuid"])
+        for field, column in SUPPORT_FIELD_COLUMNS.items():
+            if field not in support_patch:
+                continue
+            value = support_patch[field]
+            support_columns[field][index] = np.nan if value is None else value
+            if field == "chainLength":
+                value = value or 1
+            section_data.loc[section_data.index[index], column] = value
+    return support_columns, section_data
+
+
+@timed_task
+def update_supports(js_inputs: dict):
+    python_inputs = to_py(js_inputs)
+    session = active_session
+    support_patches = python_inputs["supports"]
+    uuids = session.inputs["supports"]["uuid"]
+    unknown = [patch["uuid"] for patch in support_patches if patch["uuid"] not in uuids]
+    if unknown:
+        return {"error": f"Unknown supports: {', '.join(map(str, unknown))}"}
+
+    support_columns, section_data = patch_supports(session, support_patches)
+    previous_array = session.engine.section_array
+    section_array = CachedSectionArray(
+        section_data,
+        # without initial condition, the default depends on the span lengths
+        sagging_parameter=(
+            previous_array.sagging_parameter
+            if session.inputs["initial_condition"]
+            else None
+        ),
+        sagging_temperature=previous_array.sagging_temperature,
     )
-    return get_coordinates(plt_line)
+
+    # solved on a copy of the session, which replaces it only once converged: a
+    # failure leaves the session and its registry key as they were. The solvers
+    # are copied too, their jacobians are replaced by the solves.
+    candidate = dataclasses.replace(
+        session,
+        inputs={**session.inputs, "supports": support_columns},
+        adjustment_solver=copy.copy(session.adjustment_solver),
+        change_state_solver=copy.copy(session.change_state_solver),
+    )
+    # the new chains position is close to the previous one: start from it
+    climate = session.climate or (None, None, None)
+    state_vector = session.engine.balance_model.state_vector.copy()
+    try:
+        rebuild_engine(candidate, climate, state_vector, section_array)
+    except ValueError as error:
+        print(f"warm started adjustment failed, solving from scratch: {error}")
+        candidate.adjustment_solver = None
+        candidate.change_state_solver = None
+        rebuild_engine(candidate, climate, None, section_array)
+
+    sessions.pop(session.key)
+    vars(session).update(vars(candidate))
+    session.key = section_session_key(
+        session.inputs["supports"],
+        session.inputs["cable"],
+        session.inputs["initial_condition"],
+    )
+    sessions.put(session)
+    activate_session(session)
+    return get_coordinates(plt_line, **get_output_options(python_inputs))
+
+
+@timed_task
+def sweep_climate_load(js_inputs: dict):
+    python_inputs = to_py(js_inputs)
+    # scalars are broadcast against the arrays, so a sweep over a single variable
+    # can keep the two others fixed
+    wind_pressure, cable_temperature, ice_thickness = np.broadcast_arrays(
+        np.atleast_1d(np.asarray(python_inputs["windPressure"], dtype=np.float64)),
+        np.atleast_1d(np.asarray(python_inputs["cableTemperature"], dtype=np.float64)),
+        np.atleast_1d(np.asarray(python_inputs["iceThickness"], dtype=np.float64))
+        / 100,  # in meters in the engine
+    )
+    state_count = wind_pressure.shape[0]
+    support_count = engine.support_number
+    span_count = support_count - 1
+
+    converged = np.zeros(state_count, dtype=bool)
+    horizontal_tension = np.full((state_count, span_count), np.nan)
+    vertical_tension_left = np.full((state_count, span_count), np.nan)
+    vertical_tension_right = np.full((state_count, span_count), np.nan)
+    vhl_under_chain = np.full((state_count, 3, support_count), np.nan)
+    displacement = np.full((state_count, support_count, 3), np.nan)
+    load_angle = np.full((state_count, support_count), np.nan)
+    min_altitude = np.full((state_count, span_count), np.nan)
+
+    previous_climate = active_session.climate
+    for index in range(state_count):
+        try:
+            solve_climate(
+                active_session,
+                ice_thickness=float(ice_thickness[index]),
+                new_temperature=float(cable_temperature[index]),
+                wind_pressure=float(wind_pressure[index]),
+            )
+        except ValueError as error:
+            # solve_climate left the last converged position for the next state
+            print(f"sweep state {index} failed: {error}")
+            continue
+        converged[index] = True
+        horizontal_tension[index] = engine.balance_model.Th
+        vertical_tension_left[index] = engine.balance_model.Tv_g
+        vertical_tension_right[index] = engine.balance_model.Tv_d
+        vhl_under_chain[index] = engine.balance_model.vhl_under_chain().vhl_matrix.value
+        displacement[index] = engine.get_displacement()
+        load_angle[index] = engine.cable_loads.load_angle
+        spans = plt_line.section_pts.get_spans("section").coords
+        min_altitude[index] = np.nanmin(spans[:, :, 2], axis=1)
+
+    # leave the active section in the climate it was displayed with
+    if previous_climate is not None:
+        solve_climate(active_session, *previous_climate)
+
+    return {
+        "wind_pressure": wind_pressure,
+        "cable_temperature": cable_temperature,
+        "ice_thickness": ice_thickness * 100,
+        "converged": converged.tolist(),
+        "horizontal_tension": horizontal_tension,
+        "vertical_tension_left": vertical_tension_left,
+        "vertical_tension_right": vertical_tension_right,
+        "vhl_under_chain": vhl_under_chain,
+        "displacement": displacement,
+        "load_angle": load_angle,
+        "min_altitude": min_altitude,
+    }
+
+
+def get_span_sags(engine: BalanceEngine) -> np.ndarray:
+    # largest distance between the chord and the cable of each span, in the plane
+    # of the cable: the catenary is parallel to the chord at x = p * asinh(slope)
+    span_model = engine.span_model
+    p = span_model.sagging_parameter[:-1]
+    x_m = span_model.x_m[:-1]
+    x_n = span_model.x_n[:-1]
+    z_m = span_model.z_one_point(span_model.x_m)[:-1]
+    slope = (span_model.z_one_point(span_model.x_n)[:-1] - z_m) / (x_n - x_m)
+    x = p * np.arcsinh(slope)
+    return z_m + slope * (x - x_m) - p * (np.cosh(x / p) - 1)
 
 
+@timed_task
+def get_climate_sensitivity(js_inputs: Optional[dict] = None):
+    # Derivatives of the horizontal tension and of the sag of each span with
+    # respect to the climate, by finite differences around the displayed state.
+    # All the perturbed climates start from the current chains position, the
+    # chord solver reuses its jacobian between them.
+    python_inputs = to_py(js_inputs) or {}
+    variables = ("cableTemperature", "windPressure", "iceThickness")
+    steps = {**SENSITIVITY_STEPS, **python_inputs.get("steps", {})}
+    step = np.array([steps[name] for name in variables], dtype=np.float64)
+    if np.any(step <= 0):
+        raise ValueError(f"sensitivity steps must be positive: {steps}")
+    ice_thickness, cable_temperature, wind_pressure = climate_values(
+        active_session.climate
+    )
+    # in the units of the inputs, ice in cm
+    climate = np.array([cable_temperature, wind_pressure, ice_thickness * 100])
+    # central differences, forward ones when the climate would leave its domain
+    central = np.array([True, True, climate[2] - step[2] >= 0])
+
+    # one perturbed climate per row: +step for each variable, then -step for the
+    # central ones
+    offsets = np.concatenate([np.diag(step), -np.diag(step)[central]])
+    perturbed = climate + offsets
+    span_count = engine.support_number - 1
+    horizontal_tension = np.full((len(perturbed), span_count), np.nan)
+    sag = np.full((len(perturbed), span_count), np.nan)
+
+    previous_climate = active_session.climate
+    base_state_vector = engine.balance_model.state_vector.copy()
+    base_horizontal_tension = engine.balance_model.Th.copy()
+    with timed_phase("sag"):
+        base_sag = get_span_sags(engine)
+    for index, (temperature, wind, ice) in enumerate(perturbed):
+        engine.balance_model.state_vector = base_state_vector.copy()
+        try:
+            solve_climate(
+                active_session,
+                ice_thickness=float(ice) / 100,  # in meters in the engine
+                new_temperature=float(temperature),
+                wind_pressure=float(wind),
+            )
+        except ValueError as error:
+            print(f"sensitivity state {index} failed: {error}")
+            continue
+        horizontal_tension[index] = engine.balance_model.Th
+        with timed_phase("sag"):
+            sag[index] = get_span_sags(engine)
+
+    # leave the active section in the climate it was displayed with
+    engine.balance_model.state_vector = base_state_vector
+    if previous_climate is not None:
+        solve_climate(active_session, *previous_climate)
+
+    # (state, span, output) with output 0 the tension and 1 the sag
+    values = np.stack([horizontal_tension, sag], axis=-1)
+    plus = values[: len(variables)]
+    minus = np.stack([base_horizontal_tension, base_sag], axis=-1)
+    minus = np.repeat(minus[np.newaxis], len(variables), axis=0)
+    minus[central] = values[len(variables) :]
+    denominator = np.where(central, 2 * step, step)
+    # (span, output, variable)
+    sensitivity = np.transpose(
+        (plus - minus) / denominator[:, np.newaxis, np.newaxis], (1, 2, 0)
+    )
+    converged = ~np.isnan(plus[:, 0, 0]) & ~np.isnan(minus[:, 0, 0])
+
+    return {
+        "variables": list(variables),
+        "outputs": ["horizontal_tension", "sag"],
+        "climate": climate,
+        "steps": step,
+        "central": central.tolist(),
+        "converged": converged.tolist(),
+        "horizontal_tension": base_horizontal_tension,
+        "sag": base_sag,
+        "sensitivity": sensitivity,
+    }
+
+
+@timed_task
+def set_obstacles(js_inputs: dict):
+    # replaces the obstacles of the active section, they are kept with its session
+    python_inputs = to_py(js_inputs)
+    with timed_phase("obstacle_index"):
+        obstacles = read_obstacle_columns(
+            python_inputs["obstacles"],
+            python_inputs.get("cellSize", OBSTACLE_CELL_SIZE),
+        )
+    active_session.obstacles = obstacles
+    sessions.resize(active_session, estimate_session_size(active_session))
+    return {
+        "count": len(obstacles),
+        "cells": obstacles.cells.shape[0],
+        "size": obstacles.nbytes,
+    }
+
+
+@timed_task
+def get_obstacle_clearances(js_inputs: Optional[dict] = None):
+    # Smallest distance between the cable of each span and the obstacles, in the
+    # current solved state. Obstacles further than maxDistance from a span are
+    # ignored, a span without obstacle in range gets an infinite clearance.
+    python_inputs = to_py(js_inputs) or {}
+    max_distance = float(python_inputs.get("maxDistance", OBSTACLE_MAX_DISTANCE))
+    obstacles = active_session.obstacles
+    with timed_phase("span_points"):
+        spans = plt_line.section_pts.get_spans("section").coords
+    span_count = spans.shape[0]
+    clearance = np.full(span_count, np.inf)
+    obstacle = np.full(span_count, -1)
+    cable_point = np.full((span_count, 3), np.nan)
+    obstacle_point = np.full((span_count, 3), np.nan)
+    candidates = 0
+
+    if obstacles is not None and len(obstacles):
+        with timed_phase("obstacle_query"):
+            lower = spans.min(axis=1) - max_distance
+            upper = spans.max(axis=1) + max_distance
+            pair_spans, pair_obstacles = obstacles.query_boxes(
+                lower[:, :2], upper[:, :2]
+            )
+            # the cells overlap the boxes, keep the obstacles inside them
+            points = obstacles.points[pair_obstacles]
+            inside = np.all(
+                (points >= lower[pair_spans]) & (points <= upper[pair_spans]), axis=1
+            )
+            pair_spans, points = pair_spans[inside], points[inside]
+            pair_obstacles = pair_obstacles[inside]
+            candidates = pair_spans.shape[0]
+        with timed_phase("obstacle_distances"):
+            distance = np.empty(candidates)
+            closest = np.empty((candidates, 3))
+            chunk_size = max(1, CLEARANCE_CHUNK_SIZE // max(spans.shape[1] - 1, 1))
+            for start in range(0, candidates, chunk_size):
+                chunk = slice(start, start + chunk_size)
+                distance[chunk], closest[chunk] = get_obstacle_distances(
+                    spans, points[chunk], pair_spans[chunk]
+                )
+            # closest obstacle of each span: first pair once sorted by span then
+            # distance
+            order = np.lexsort((distance, pair_spans))
+            first = order[np.unique(pair_spans[order], return_index=True)[1]]
+            first = first[distance[first] <= max_distance]
+            clearance[pair_spans[first]] = distance[first]
+            obstacle[pair_spans[first]] = obstacles.order[pair_obstacles[first]]
+            cable_point[pair_spans[first]] = closest[first]
+            obstacle_point[pair_spans[first]] = points[first]
+
+    return {
+        "clearance": clearance,
+        "obstacle_uuid": [
+            obstacles.uuids[index] if index >= 0 else None for index in obstacle
+        ],
+        "obstacle_type": [
+            obstacles.types[index] if index >= 0 else None for index in obstacle
+        ],
+        "cable_point": cable_point,
+        "obstacle_point": obstacle_point,
+        "candidates": candidates,
+    }
+
+
+@timed_task
 def get_support_coordinates(js_inputs: dict):
-    python_inputs = js_inputs.to_py()
+    python_inputs = to_py(js_inputs)
     # print("get_support_coordinates: ", python_inputs)
     # coordinates = python_inputs["coordinates"]
     coordinates = python_inputs["coordinates"]
@@ -384,13 +1623,14 @@ def get_support_coordinates(js_inputs: dict):
     shape_name = "pyl"
     shape_set_number = np.array(python_inputs["attachmentSetNumbers"])
 
-    pyl_shape = SupportShape(
-        name=shape_name,
-        xyz_arms=shape_values,
-        set_number=shape_set_number,
-    )
-    shape_points = pyl_shape.support_points
-    text_display_points = pyl_shape.labels_points
+    with timed_phase("support_shape"):
+        pyl_shape = SupportShape(
+            name=shape_name,
+            xyz_arms=shape_values,
+            set_number=shape_set_number,
+        )
+        shape_points = pyl_shape.support_points
+        text_display_points = pyl_shape.labels_points
     text_to_display = pyl_shape.set_number
 
     # some_support_name = sample_support_catalog.keys()[0]
@@ -409,5 +1649,30 @@ def get_support_coordinates(js_inputs: dict):
     }
 
 
+def get_diagnostics(js_inputs: Optional[dict] = None):
+    # rolling phase timings of the last TIMING_WINDOW runs of each task, and the
+    # state of the session registry
+    python_inputs = to_py(js_inputs) or {}
+    diagnostics = {
+        "tasks": task_timings.statistics(),
+        "sessions": {
+            "count": len(sessions),
+            "size": sessions.total_size,
+            "max_size": sessions.max_bytes,
+        },
+    }
+    if python_inputs.get("reset"):
+        task_timings.clear()
+    return diagnostics
+
+
+def warm_up():
+    # pandera imports its pandas validation backends on the first validation:
+    # done here by the pyodide snapshot build (and the benchmark), not by the
+    # first init_section of the user
+    schema = pa.DataFrameSchema({"value": pa.Column(float)})
+    schema.validate(pd.DataFrame({"value": [0.0]}))
+
+
 # print("im in the main function")
 # result = init_section()
@@ -0,0 +1,173 @@
+"""
+Tests of the pure python parts of functions.py, run under CPython with pytest:
+    npm run test-python
+tests.py is the mechaphlowers test suite run by the worker in Pyodide.
+"""
+
+import contextlib
+import io
+import runpy
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+sys.path.append(str(Path(__file__).parents[7] / "scripts"))
+from generate_sections import generate_inputs  # noqa: E402
+
+with contextlib.redirect_stdout(io.StringIO()):
+    functions = runpy.run_path(str(Path(__file__).with_name("functions.py")))
+# globals of the tasks, run_path returns a copy of them
+task_globals = functions["init_section"].__globals__
+
+SessionRegistry = functions["SessionRegistry"]
+ObstacleIndex = functions["ObstacleIndex"]
+pack_buffers = functions["pack_buffers"]
+split_points = functions["split_points"]
+
+
+def make_session(key: str, size: int):
+    # the registry only reads the key and the size of a session
+    return SimpleNamespace(key=key, size=size)
+
+
+def test_registry_put_replaces_a_key():
+    sessions = SessionRegistry(max_bytes=100)
+    sessions.put(make_session("a", 30))
+    sessions.put(make_session("a", 50))
+
+    assert len(sessions) == 1
+    assert sessions.total_size == 50
+
+
+def test_registry_evicts_the_least_recently_used():
+    sessions = SessionRegistry(max_bytes=100)
+    for key in "abc":
+        sessions.put(make_session(key, 40))
+    sessions.get("b")
+    sessions.put(make_session("d", 40))
+
+    assert list(sessions._sessions) == ["b", "d"]
+    assert sessions.total_size == 80
+
+
+def test_registry_keeps_the_most_recently_used_over_budget():
+    sessions = SessionRegistry(max_bytes=100)
+    sessions.put(make_session("a", 40))
+    sessions.put(make_session("b", 150))
+
+    assert list(sessions._sessions) == ["b"]
+    assert sessions.total_size == 150
+
+
+def test_registry_resize_evicts():
+    sessions = SessionRegistry(max_bytes=100)
+    sessions.put(make_session("a", 40))
+    session = make_session("b", 40)
+    sessions.put(session)
+    sessions.resize(session, 90)
+
+    assert list(sessions._sessions) == ["b"]
+    assert sessions.total_size == 90
+
+
+def test_registry_resize_of_an_unregistered_session():
+    sessions = SessionRegistry(max_bytes=100)
+    evicted = make_session("a", 40)
+    sessions.put(evicted)
+    sessions.pop("a")
+    sessions.put(make_session("b", 40))
+    sessions.resize(evicted, 60)
+    # a session replaced under the same key is not the registered one either
+    replaced = make_session("b", 10)
+    sessions.resize(replaced, 70)
+
+    assert evicted.size == 60
+    assert replaced.size == 70
+    assert sessions.total_size == 40
+
+
+def test_session_size_follows_the_solves():
+    task_globals["sessions"].clear()
+    estimate_session_size = functions["estimate_session_size"]
+    with contextlib.redirect_stdout(io.StringIO()):
+        functions["init_section"](generate_inputs(10))
+        session = task_globals["active_session"]
+        functions["change_climate_load"](
+            {"windPressure": 300, "cableTemperature": 40, "iceThickness": 0}
+        )
+
+    # the solve resized the registered session, jacobians of the solvers included
+    assert session.size == estimate_session_size(session)
+    assert task_globals["sessions"].total_size == session.size
+    solver = session.change_state_solver
+    jacobian, solver.last_jacobian = solver.last_jacobian, None
+    assert estimate_session_size(session) == session.size - jacobian.nbytes
+    solver.last_jacobian = jacobian
+
+
+def test_pack_buffers():
+    arrays = {"a": np.arange(6.0).reshape(2, 3), "b": np.array([7.0]), "c": []}
+
+    packed = pack_buffers(arrays, "float32")
+
+    assert packed["precision"] == "float32"
+    assert packed["buffer"].dtype == np.float32
+    assert packed["layout"] == {
+        "a": {"offset": 0, "shape": [2, 3]},
+        "b": {"offset": 6, "shape": [1]},
+        "c": {"offset": 7, "shape": [0]},
+    }
+    np.testing.assert_array_equal(packed["buffer"], [0, 1, 2, 3, 4, 5, 7])
+
+
+@pytest.mark.parametrize("ends_with_separator", [True, False])
+def test_split_points(ends_with_separator):
+    nan = [np.nan] * 3
+    spans = [np.arange(6.0).reshape(2, 3), np.arange(9.0, 18.0).reshape(3, 3)]
+    rows = [*spans[0], nan, *spans[1]] + ([nan] if ends_with_separator else [])
+
+    split = split_points(np.array(rows).ravel())
+
+    np.testing.assert_array_equal(split.offsets, [0, 2, 5])
+    assert len(split.spans()) == 2
+    for span, expected in zip(split.spans(), spans):
+        np.testing.assert_array_equal(span, expected)
+
+
+def test_split_points_of_nothing():
+    split = split_points([])
+
+    assert split.points.shape == (0, 3)
+    assert split.spans() == []
+
+
+def test_obstacle_index_query_boxes():
+    rng = np.random.default_rng(0)
+    points = rng.uniform([-200, -100, 0], [800, 300, 30], size=(500, 3))
+    index = ObstacleIndex(points, list(range(500)), [None] * 500, cell_size=25.0)
+    lower = rng.uniform([-300, -200], [900, 400], size=(40, 2))
+    upper = lower + rng.uniform(0, 150, size=(40, 2))
+
+    box, position = index.query_boxes(lower, upper)
+    found = index.order[position]
+
+    for i in range(len(lower)):
+        inside = np.all((points[:, :2] >= lower[i]) & (points[:, :2] <= upper[i]), 1)
+        candidates = found[box == i]
+        # every point of the box, each once, and only points of its cells
+        assert set(np.flatnonzero(inside)) <= set(candidates)
+        assert len(set(candidates)) == len(candidates)
+        margin = index.cell_size
+        assert np.all(points[candidates, :2] >= lower[i] - margin)
+        assert np.all(points[candidates, :2] <= upper[i] + margin)
+
+
+def test_obstacle_index_without_points():
+    index = ObstacleIndex(np.zeros((0, 3)), [], [])
+
+    box, position = index.query_boxes(np.zeros((2, 2)), np.ones((2, 2)))
+
+    assert box.shape == position.shape == (0,)
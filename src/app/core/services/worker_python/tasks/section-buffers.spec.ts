@@ -0,0 +1,63 @@
+/**
+ * Copyright (c) 2025, RTE (http://www.rte-france.com)
+ * This Source Code Form is subject to the terms of the Mozilla Public
+ * License, v. 2.0. If a copy of the MPL was not distributed with this
+ * file, You can obtain one at http://mozilla.org/MPL/2.0/.
+ */
+import {
+  getBufferRows,
+  getBufferSpans,
+  getBufferView
+} from './section-buffers';
+import { GetSectionBuffersOutput } from './types';
+
+describe('section buffers', () => {
+  const output = {
+    buffer: new Float64Array([1, 2, 3, 4, 5, 6, 7, 8]),
+    precision: 'float64',
+    layout: {
+      L0: { offset: 0, shape: [2] },
+      displacement: { offset: 2, shape: [2, 3] }
+    }
+  } as unknown as GetSectionBuffersOutput;
+
+  it('should return a view on the packed field', () => {
+    const view = getBufferView(output, 'displacement');
+    expect(view.shape).toEqual([2, 3]);
+    expect(Array.from(view.data)).toEqual([3, 4, 5, 6, 7, 8]);
+    expect(view.data.buffer).toBe(output.buffer.buffer);
+  });
+
+  it('should split a view into rows', () => {
+    const rows = getBufferRows(getBufferView(output, 'displacement'));
+    expect(rows.map((row) => Array.from(row))).toEqual([
+      [3, 4, 5],
+      [6, 7, 8]
+    ]);
+  });
+
+  it('should split decimated spans using their offsets', () => {
+    const lodOutput = {
+      buffer: new Float64Array([1, 1, 1, 2, 2, 2, 3, 3, 3, 0, 2, 3]),
+      precision: 'float64',
+      layout: {
+        spans: { offset: 0, shape: [3, 3] },
+        span_offsets: { offset: 9, shape: [3] }
+      }
+    } as unknown as GetSectionBuffersOutput;
+    const spans = getBufferSpans(lodOutput);
+    expect(spans.map((span) => Array.from(span))).toEqual([
+      [1, 1, 1, 2, 2, 2],
+      [3, 3, 3]
+    ]);
+  });
+
+  it('should split regular spans into rows', () => {
+    const regularOutput = {
+      buffer: new Float64Array([1, 1, 1, 2, 2, 2]),
+      precision: 'float64',
+      layout: { spans: { offset: 0, shape: [2, 1, 3] } }
+    } as unknown as GetSectionBuffersOutput;
+    expect(getBufferSpans(regularOutput)).toHaveLength(2);
+  });
+});
@@ -0,0 +1,63 @@
+/**
+ * Copyright (c) 2025, RTE (http://www.rte-france.com)
+ * This Source Code Form is subject to the terms of the Mozilla Public
+ * License, v. 2.0. If a copy of the MPL was not distributed with this
+ * file, You can obtain one at http://mozilla.org/MPL/2.0/.
+ */
+import { GetSectionBuffersOutput, SectionField } from './types';
+
+export interface BufferView {
+  data: Float64Array | Float32Array;
+  shape: number[];
+}
+
+/**
+ * Returns a view on one field of a packed section output, without copying.
+ * Values are laid out in row-major order following `shape`.
+ */
+export const getBufferView = (
+  output: GetSectionBuffersOutput,
+  name: SectionField
+): BufferView => {
+  const { offset, shape } = output.layout[name];
+  const size = shape.reduce((total, dimension) => total * dimension, 1);
+  return {
+    data: output.buffer.subarray(offset, offset + size),
+    shape
+  };
+};
+
+/**
+ * Splits the rows of a view (first dimension) into subviews, e.g. one per span.
+ */
+export const getBufferRows = ({
+  data,
+  shape
+}: BufferView): (Float64Array | Float32Array)[] => {
+  const [rows, ...rest] = shape;
+  const rowSize = rest.reduce((total, dimension) => total * dimension, 1);
+  return Array.from({ length: rows ?? 0 }, (_, index) =>
+    data.subarray(index * rowSize, (index + 1) * rowSize)
+  );
+};
+
+/**
+ * Returns one view of points per span, whether spans all have the same number
+ * of points or were decimated with a level of detail (see span_offsets).
+ */
+export const getBufferSpans = (
+  output: GetSectionBuffersOutput
+): (Float64Array | Float32Array)[] => {
+  const spans = getBufferView(output, 'spans');
+  const offsetsLayout = output.layout.span_offsets;
+  if (!offsetsLayout) {
+    return getBufferRows(spans);
+  }
+  const offsets = output.buffer.subarray(
+    offsetsLayout.offset,
+    offsetsLayout.offset + offsetsLayout.shape[0]
+  );
+  return Array.from({ length: offsets.length - 1 }, (_, index) =>
+    spans.data.subarray(offsets[index] * 3, offsets[index + 1] * 3)
+  );
+};
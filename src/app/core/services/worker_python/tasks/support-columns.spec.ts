@@ -0,0 +1,51 @@
+/**
+ * Copyright (c) 2025, RTE (http://www.rte-france.com)
+ * This Source Code Form is subject to the terms of the Mozilla Public
+ * License, v. 2.0. If a copy of the MPL was not distributed with this
+ * file, You can obtain one at http://mozilla.org/MPL/2.0/.
+ */
+import { Support } from '@core/data/database/interfaces/support';
+import { toSupportColumns } from './support-columns';
+
+describe('toSupportColumns', () => {
+  const supports = [
+    {
+      uuid: 'a',
+      name: 'Support A',
+      spanLength: 400,
+      spanAngle: 0,
+      attachmentHeight: 30,
+      armLength: 2,
+      chainLength: 3,
+      chainWeight: 500,
+      supportFootAltitude: 10
+    },
+    {
+      uuid: 'b',
+      name: null,
+      spanLength: null,
+      spanAngle: null,
+      attachmentHeight: 32,
+      armLength: null,
+      chainLength: null,
+      chainWeight: null,
+      supportFootAltitude: 12
+    }
+  ] as Support[];
+
+  it('should build one array per field', () => {
+    const columns = toSupportColumns(supports);
+    expect(columns.uuid).toEqual(['a', 'b']);
+    expect(columns.name).toEqual(['Support A', null]);
+    expect(columns.attachmentHeight).toBeInstanceOf(Float64Array);
+    expect(Array.from(columns.attachmentHeight)).toEqual([30, 32]);
+    expect(Array.from(columns.supportFootAltitude)).toEqual([10, 12]);
+  });
+
+  it('should convert null values to NaN', () => {
+    const columns = toSupportColumns(supports);
+    expect(columns.spanLength[0]).toBe(400);
+    expect(columns.spanLength[1]).toBeNaN();
+    expect(columns.chainLength[1]).toBeNaN();
+  });
+});
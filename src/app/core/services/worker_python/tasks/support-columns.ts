@@ -0,0 +1,38 @@
+/**
+ * Copyright (c) 2025, RTE (http://www.rte-france.com)
+ * This Source Code Form is subject to the terms of the Mozilla Public
+ * License, v. 2.0. If a copy of the MPL was not distributed with this
+ * file, You can obtain one at http://mozilla.org/MPL/2.0/.
+ */
+import { Support } from '@core/data/database/interfaces/support';
+import { SupportColumns } from './types';
+
+type NumericSupportField = Exclude<keyof SupportColumns, 'uuid' | 'name'>;
+
+const NUMERIC_FIELDS: NumericSupportField[] = [
+  'attachmentHeight',
+  'spanLength',
+  'spanAngle',
+  'armLength',
+  'chainLength',
+  'chainWeight',
+  'supportFootAltitude'
+];
+
+/**
+ * Converts supports to the columnar input of the getLit task, null values
+ * becoming NaN.
+ */
+export const toSupportColumns = (supports: Support[]): SupportColumns => {
+  const columns = {
+    uuid: supports.map((support) => support.uuid),
+    name: supports.map((support) => support.name)
+  } as SupportColumns;
+  for (const field of NUMERIC_FIELDS) {
+    columns[field] = Float64Array.from(
+      supports,
+      (support) => support[field] ?? NaN
+    );
+  }
+  return columns;
+};
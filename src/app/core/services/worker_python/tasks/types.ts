@@ -1,5 +1,6 @@
 import { Cable } from '@core/data/database/interfaces/cable';
 import { Section } from '@core/data/database/interfaces/section';
+import { Support } from '@core/data/database/interfaces/support';
 import { View } from '@ui/shared/components/studio/section/helpers/types';
 
 export enum Task {
@@ -7,7 +8,14 @@ export enum Task {
   getLit = 'getLit',
   changeClimateLoad = 'changeClimateLoad',
   refreshProjection = 'refreshProjection',
-  getSupportCoordinates = 'getSupportCoordinates'
+  getSupportCoordinates = 'getSupportCoordinates',
+  sweepClimateLoad = 'sweepClimateLoad',
+  updateSupports = 'updateSupports',
+  solveSections = 'solveSections',
+  getDiagnostics = 'getDiagnostics',
+  getClimateSensitivity = 'getClimateSensitivity',
+  setObstacles = 'setObstacles',
+  getObstacleClearances = 'getObstacleClearances'
 }
 
 export enum DataError {
@@ -36,35 +44,310 @@ export interface GetSectionOutput {
   load_angle: number[];
   displacement: number[][];
   span_length: number[];
+  // set when a window was requested: spans, insulators and supports then start
+  // at support window.startSupport
+  window?: SectionWindow;
+}
+
+export type OutputFormat = 'lists' | 'buffers';
+export type BufferPrecision = 'float64' | 'float32';
+
+// Level of detail of the spans: each span gets just enough points to stay within
+// `tolerance` meters (default 0.5) of the cable. Only the spans between
+// startSupport and endSupport keep the full resolution, when one of them is
+// given (e.g. the visible spans in a following refreshProjection): without
+// them, every span of the section is a coarse preview.
+export interface LodOptions {
+  tolerance?: number;
+  startSupport?: number;
+  endSupport?: number;
+}
+
+// Only return spans, insulators and supports between startSupport and
+// endSupport (defaults to the task ones), plus `margin` supports on each side
+export interface WindowOptions {
+  startSupport?: number;
+  endSupport?: number;
+  margin?: number;
+}
+
+// First and last support returned
+export interface SectionWindow {
+  startSupport: number;
+  endSupport: number;
+}
+
+export interface SectionOutputOptions {
+  outputFormat?: OutputFormat;
+  precision?: BufferPrecision;
+  lod?: LodOptions;
+  window?: WindowOptions;
+}
+
+// Fields of GetSectionOutput holding arrays
+export type SectionField = Exclude<keyof GetSectionOutput, 'window'>;
+
+export interface BufferLayoutEntry {
+  offset: number;
+  shape: number[];
+}
+
+// Returned instead of GetSectionOutput when outputFormat is 'buffers':
+// every field is packed in one contiguous typed array, see section-buffers.ts.
+// With lod, spans are stored one after the other and span_offsets gives the
+// first point of each span.
+export interface GetSectionBuffersOutput {
+  buffer: Float64Array | Float32Array;
+  precision: BufferPrecision;
+  layout: Record<SectionField, BufferLayoutEntry> & {
+    span_offsets?: BufferLayoutEntry;
+  };
+  window?: SectionWindow;
+}
+
+// Convergence of a climate change, iterations and jacobian evaluations are
+// summed over the continuation steps; wall_time is in seconds
+export interface SolverStats {
+  iterations: number;
+  jacobian_evaluations: number;
+  residual: number;
+  max_iterations: number;
+  steps: number;
+  wall_time: number;
+}
+
+// One row per solved climate state; tensions are in N, vhl in daN
+export interface SweepClimateLoadOutput {
+  wind_pressure: Float64Array;
+  cable_temperature: Float64Array;
+  ice_thickness: Float64Array;
+  converged: boolean[];
+  horizontal_tension: Float64Array[];
+  vertical_tension_left: Float64Array[];
+  vertical_tension_right: Float64Array[];
+  vhl_under_chain: Float64Array[][];
+  displacement: Float64Array[][];
+  load_angle: Float64Array[];
+  min_altitude: Float64Array[];
+}
+
+export type ClimateVariable =
+  | 'cableTemperature'
+  | 'windPressure'
+  | 'iceThickness';
+
+// Derivatives around the displayed climate, sensitivity[span][output][variable]
+// in the order of `outputs` and `variables`, in N and m per °C, Pa and cm.
+// Central differences, forward ones where `central` is false (no ice);
+// derivatives of a variable whose perturbed solves failed are NaN.
+export interface ClimateSensitivityOutput {
+  variables: ClimateVariable[];
+  outputs: ('horizontal_tension' | 'sag')[];
+  climate: Float64Array;
+  steps: Float64Array;
+  central: boolean[];
+  converged: boolean[];
+  horizontal_tension: Float64Array;
+  sag: Float64Array;
+  sensitivity: Float64Array[][];
+}
+
+// Obstacles of a section (buildings, crossings, vegetation...) as points in
+// the frame of the spans, one array per field, index i being obstacle i
+export interface ObstacleColumns {
+  uuid: string[];
+  type?: (string | null)[];
+  x: Float64Array;
+  y: Float64Array;
+  z: Float64Array;
+}
+
+// Closest obstacle of each span in the current climate, clearances in m.
+// Spans without obstacle within maxDistance get an Infinity clearance, null
+// obstacles and NaN points.
+export interface ObstacleClearancesOutput {
+  clearance: Float64Array;
+  obstacle_uuid: (string | null)[];
+  obstacle_type: (string | null)[];
+  cable_point: Float64Array[];
+  obstacle_point: Float64Array[];
+  // obstacle-span pairs whose distance was computed
+  candidates: number;
+}
+
+export type SupportPatch = Pick<Support, 'uuid'> &
+  Partial<Pick<Support, 'attachmentHeight' | 'spanLength' | 'chainLength'>>;
+
+// Supports of a section as one array per field, index i being support i.
+// Missing values are NaN, spanLength of the last support included.
+export interface SupportColumns {
+  uuid: string[];
+  name?: (string | null)[];
+  attachmentHeight: Float64Array;
+  spanLength: Float64Array;
+  spanAngle: Float64Array;
+  armLength: Float64Array;
+  chainLength: Float64Array;
+  chainWeight: Float64Array;
+  supportFootAltitude: Float64Array;
+}
+
+export interface SectionBatchItem {
+  section: Section;
+  cable: Cable;
+  supportColumns?: SupportColumns;
+}
+
+export interface SectionBatchStatus {
+  index: number;
+  uuid: string;
+  // seconds
+  time: number;
+  error: string | null;
+}
+
+// Posted as soon as a section of a solveSections batch is solved
+export interface SectionBatchProgress extends SectionBatchStatus {
+  result: GetSectionOutput | null;
+}
+
+export interface SectionBatchSummary {
+  sections: SectionBatchStatus[];
+  solved: number;
+  failed: number;
+  // seconds
+  total_time: number;
+}
+
+// Durations (ms) of the phases of a python task, with `total` for the whole
+// python function and `toJs` for the conversion of its result
+export type TaskTimings = Record<string, number>;
+
+// Statistics (ms) of a phase over the last runs of a task
+export interface PhaseStatistics {
+  count: number;
+  last: number;
+  mean: number;
+  median: number;
+  p95: number;
+  max: number;
+}
+
+export interface DiagnosticsOutput {
+  tasks: Record<
+    string,
+    { runs: number; phases: Record<string, PhaseStatistics> }
+  >;
+  // solved sections kept by the worker, sizes in bytes
+  sessions: { count: number; size: number; max_size: number };
 }
 
 export interface TaskInputs {
-  [Task.getLit]: { section: Section; cable: Cable };
+  // with supportColumns, section.supports is not read and can be left empty
+  [Task.getLit]: {
+    section: Section;
+    cable: Cable;
+    supportColumns?: SupportColumns;
+  } & SectionOutputOptions;
   [Task.runTests]: undefined;
   [Task.changeClimateLoad]: {
     windPressure: number;
     cableTemperature: number;
     iceThickness: number;
-  };
+    // solve intermediate climates from the current one, defaults to 1
+    steps?: number;
+  } & SectionOutputOptions;
   [Task.refreshProjection]: {
     startSupport: number;
     endSupport: number;
     view: View;
-  };
+  } & SectionOutputOptions;
   [Task.getSupportCoordinates]: {
     coordinates: (number | undefined)[][];
     attachmentSetNumbers: number[];
   };
+  [Task.sweepClimateLoad]: {
+    windPressure: number | number[];
+    cableTemperature: number | number[];
+    iceThickness: number | number[];
+  };
+  // Only the listed fields of the given supports are changed, other supports
+  // of the loaded section are kept
+  [Task.updateSupports]: {
+    supports: SupportPatch[];
+  } & SectionOutputOptions;
+  [Task.solveSections]: {
+    sections: SectionBatchItem[];
+  } & SectionOutputOptions;
+  // reset clears the statistics once returned
+  [Task.getDiagnostics]: { reset?: boolean } | undefined;
+  // finite difference steps, default to 1 °C, 10 Pa and 0.1 cm
+  [Task.getClimateSensitivity]:
+    | { steps?: Partial<Record<ClimateVariable, number>> }
+    | undefined;
+  // replaces the obstacles of the loaded section, bucketed in a grid of
+  // cellSize meters (default 25)
+  [Task.setObstacles]: { obstacles: ObstacleColumns; cellSize?: number };
+  // maxDistance defaults to 50 m
+  [Task.getObstacleClearances]: { maxDistance?: number } | undefined;
 }
 
 export interface TaskOutputs {
   [Task.getLit]: GetSectionOutput;
   [Task.runTests]: undefined;
-  [Task.changeClimateLoad]: GetSectionOutput;
+  [Task.changeClimateLoad]: GetSectionOutput & { solver: SolverStats };
   [Task.refreshProjection]: GetSectionOutput;
   [Task.getSupportCoordinates]: {
     shape_points: number[][];
     text_display_points: number[][];
     text_to_display: string[];
   };
+  [Task.sweepClimateLoad]: SweepClimateLoadOutput;
+  [Task.updateSupports]: GetSectionOutput;
+  [Task.solveSections]: SectionBatchSummary;
+  [Task.getDiagnostics]: DiagnosticsOutput;
+  [Task.getClimateSensitivity]: ClimateSensitivityOutput;
+  // size of the obstacle index in bytes
+  [Task.setObstacles]: { count: number; cells: number; size: number };
+  [Task.getObstacleClearances]: ObstacleClearancesOutput;
 }
+
+// Tasks returning the coordinates of a section, described as lists in
+// TaskOutputs and packed in a GetSectionBuffersOutput instead with
+// outputFormat: 'buffers'
+export type SectionTask =
+  | Task.getLit
+  | Task.changeClimateLoad
+  | Task.refreshProjection
+  | Task.updateSupports;
+
+// Coordinates returned for the given inputs, both formats when outputFormat is
+// only known at runtime
+export type SectionOutput<Inputs> =
+  Inputs extends { outputFormat: 'buffers' }
+    ? GetSectionBuffersOutput
+    : Inputs extends { outputFormat: 'lists' }
+      ? GetSectionOutput
+      : 'outputFormat' extends keyof Inputs
+        ? GetSectionOutput | GetSectionBuffersOutput
+        : GetSectionOutput;
+
+// Output of a task for the given inputs
+export type TaskOutput<taskId extends Task, Inputs = TaskInputs[taskId]> =
+  taskId extends SectionTask
+    ? Omit<TaskOutputs[taskId], keyof GetSectionOutput> & SectionOutput<Inputs>
+    : TaskOutputs[taskId];
+
+// Python tasks returning a dict add their timings to it
+export type TaskResult<taskId extends Task, Inputs = TaskInputs[taskId]> =
+  TaskOutput<taskId, Inputs> extends object
+    ? TaskOutput<taskId, Inputs> & { timings?: TaskTimings }
+    : TaskOutput<taskId, Inputs>;
+
+// Intermediate results posted by tasks before their output
+export interface TaskProgress {
+  [Task.solveSections]: SectionBatchProgress;
+}
+
+export type TaskProgressOf<taskId extends Task> =
+  taskId extends keyof TaskProgress ? TaskProgress[taskId] : never;
@@ -183,6 +183,16 @@ describe('WorkerService', () => {
       expect(service._ready.getValue()).toBeTruthy();
     });
 
+    it('should set ready to true when importTime is 0', () => {
+      service.setup();
+
+      // A worker restored from a snapshot has nothing left to import
+      mockWorker.onmessage({ data: { importTime: 0 } });
+
+      // @ts-expect-error - We are testing the private property
+      expect(service._ready.getValue()).toBeTruthy();
+    });
+
     it('should handle task result message with id', () => {
       service.setup();
 
@@ -268,6 +278,27 @@ describe('WorkerService', () => {
       expect(response.error).toBeUndefined();
     });
 
+    it('should forward progress messages until the task ends', async () => {
+      service.setup();
+
+      const onProgress = jest.fn();
+      const promise = service.runTask(
+        Task.solveSections,
+        { sections: [] },
+        onProgress
+      );
+      const id = postMessageSpy.mock.calls[0][0].id;
+      const progress = { index: 0, uuid: 'section-1', error: null };
+
+      mockWorker.onmessage({ data: { id, progress } });
+      expect(onProgress).toHaveBeenCalledWith(progress);
+
+      mockWorker.onmessage({ data: { id, result: { solved: 1 } } });
+      const response = await promise;
+      expect(response.result).toEqual({ solved: 1 });
+      expect(service.progressHandlerMap[id]).toBeUndefined();
+    });
+
     it('should generate unique id for each task', async () => {
       service.setup();
 
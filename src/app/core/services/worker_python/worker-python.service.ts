@@ -8,7 +8,13 @@
 import { Injectable, signal } from '@angular/core';
 import { BehaviorSubject, Observable } from 'rxjs';
 import { v4 as uuidv4 } from 'uuid';
-import { Task, TaskError, TaskInputs, TaskOutputs } from './tasks/types';
+import {
+  Task,
+  TaskError,
+  TaskInputs,
+  TaskProgressOf,
+  TaskResult
+} from './tasks/types';
 
 @Injectable({
   providedIn: 'root'
@@ -28,6 +34,7 @@ export class WorkerPythonService {
   });
   handlerMap: Record<string, (result: any, error: TaskError | null) => void> =
     {};
+  progressHandlerMap: Record<string, (progress: any) => void> = {};
 
   get ready$(): Observable<boolean> {
     return this._ready.asObservable();
@@ -42,29 +49,41 @@ export class WorkerPythonService {
     this.worker.onmessage = ({ data }) => {
       if (data.error === TaskError.PYODIDE_LOAD_ERROR) {
         this.pyodideLoadError$.next(true);
-      } else if (data.loadTime) {
+      } else if ('loadTime' in data) {
         this.times.set({ ...this.times(), loadTime: data.loadTime });
-      } else if (data.importTime) {
+      } else if ('importTime' in data) {
+        // close to 0 when the worker restored a pyodide snapshot
         this.times.set({ ...this.times(), importTime: data.importTime });
         this._ready.next(true);
+      } else if (data.id && 'progress' in data) {
+        this.progressHandlerMap[data.id]?.(data.progress);
       } else if (data.id) {
         this.handlerMap[data.id](data.result, data.error);
       }
     };
   }
 
-  runTask<taskId extends Task>(
+  // the result type follows the inputs, e.g. outputFormat: 'buffers'
+  runTask<
+    taskId extends Task,
+    Inputs extends TaskInputs[taskId] = TaskInputs[taskId]
+  >(
     task: taskId,
-    inputs: TaskInputs[taskId]
-  ): Promise<{ result: TaskOutputs[taskId]; error: TaskError | null }> {
+    inputs: Inputs,
+    onProgress?: (progress: TaskProgressOf<taskId>) => void
+  ): Promise<{ result: TaskResult<taskId, Inputs>; error: TaskError | null }> {
     const id = uuidv4();
     return new Promise((resolve) => {
       this.worker?.postMessage({ task, inputs, id });
+      if (onProgress) {
+        this.progressHandlerMap[id] = onProgress;
+      }
       this.handlerMap[id] = (
-        result: TaskOutputs[taskId],
+        result: TaskResult<taskId, Inputs>,
         error: TaskError | null
       ) => {
         delete this.handlerMap[id];
+        delete this.progressHandlerMap[id];
         resolve({ result, error });
       };
     });
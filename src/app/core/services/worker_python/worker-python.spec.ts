@@ -12,7 +12,12 @@ import pythonPackages from './python-packages.json';
 
 // Mock dependencies
 jest.mock('pyodide', () => ({
-  loadPyodide: jest.fn()
+  loadPyodide: jest.fn(),
+  version: '0.27.4'
+}));
+
+jest.mock('./pyodide-snapshot', () => ({
+  fetchPyodideSnapshot: jest.fn()
 }));
 
 jest.mock('./tasks/handle-task', () => ({
@@ -78,6 +83,8 @@ describe('Worker', () => {
     it('should load Pyodide with correct configuration', async () => {
       // Import the worker to trigger the initialization
       await import('./worker-python');
+      // loadPyodide is called once the snapshot lookup is done
+      await new Promise((resolve) => setTimeout(resolve, 0));
 
       // Verify loadPyodide was called with correct parameters
       expect(loadPyodide).toHaveBeenCalledWith({
@@ -100,6 +107,50 @@ describe('Worker', () => {
       expect(callArgs.packages).toEqual(expect.arrayContaining(localPackages));
     });
 
+    it('should restore a snapshot and handle tasks', async () => {
+      const snapshot = new ArrayBuffer(8);
+      await jest.isolateModulesAsync(async () => {
+        // modules of the isolated registry, used by the worker imported below
+        const pyodideModule = await import('pyodide');
+        const { fetchPyodideSnapshot } = await import('./pyodide-snapshot');
+        const handleTaskModule = await import('./tasks/handle-task');
+        (pyodideModule.loadPyodide as jest.Mock).mockResolvedValue(mockPyodide);
+        (fetchPyodideSnapshot as jest.Mock).mockResolvedValue(snapshot);
+        (handleTaskModule.handleTask as jest.Mock).mockResolvedValue({
+          result: 'success'
+        });
+
+        await import('./worker-python');
+        await new Promise((resolve) => setTimeout(resolve, 0));
+
+        expect(pyodideModule.loadPyodide).toHaveBeenCalledTimes(1);
+        expect(pyodideModule.loadPyodide).toHaveBeenCalledWith(
+          expect.objectContaining({ _loadSnapshot: snapshot })
+        );
+        expect(mockPyodide.runPython).not.toHaveBeenCalled();
+        expect(mockPostMessage).toHaveBeenCalledWith({
+          importTime: expect.any(Number)
+        });
+
+        const messageHandler = mockAddEventListener.mock.calls.at(-1)[1];
+        messageHandler({
+          data: { task: 'getLit', inputs: { section: {} }, id: 'task-id' }
+        });
+        await new Promise((resolve) => setTimeout(resolve, 0));
+
+        expect(handleTaskModule.handleTask).toHaveBeenCalledWith(
+          mockPyodide,
+          'getLit',
+          { section: {} },
+          expect.any(Function)
+        );
+        expect(mockPostMessage).toHaveBeenCalledWith({
+          result: 'success',
+          id: 'task-id'
+        });
+      });
+    });
+
     // it('should post load time message after Pyodide loads', async () => {
     //   await import('./worker');
     //   await new Promise((resolve) => setTimeout(resolve, 1000));
@@ -6,39 +6,61 @@
  */
 /// <reference lib="webworker" />
 
-import { loadPyodide } from 'pyodide';
+import { loadPyodide, version } from 'pyodide';
 import importScript from './tasks/python-scripts/functions.py';
 import pythonPackages from './python-packages.json';
+import { fetchPyodideSnapshot } from './pyodide-snapshot';
 import { handleTask } from './tasks/handle-task';
 import { Task, TaskError, TaskInputs } from './tasks/types';
 
 export type PyodideAPI = Awaited<ReturnType<typeof loadPyodide>>;
 let pyodide: PyodideAPI;
 
+// also loaded in the snapshot made by scripts/make_pyodide_snapshot.mjs
+const PYODIDE_PACKAGES = ['numpy', 'pandas', 'pydantic', 'packaging', 'wrapt'];
+
 async function loadPyodideAndPackages() {
   try {
-    const localPythonPackages = [
-      ...Object.values(pythonPackages)
-        .map((pkg) =>
-          pkg.source === 'local' ? self.name + 'pyodide/' + pkg.file_name : ''
-        )
-        .filter(Boolean)
-    ];
-    const start = performance.now();
-    pyodide = await loadPyodide({
-      indexURL: 'https://cdn.jsdelivr.net/pyodide/v0.27.4/full',
+    const localPythonPackages = Object.values(pythonPackages)
+      .filter((pkg) => pkg.source === 'local')
+      .map((pkg) => pkg.file_name);
+    const options = {
+      // runtime of the installed pyodide, which snapshots are tied to
+      indexURL: `https://cdn.jsdelivr.net/pyodide/v${version}/full`,
       packages: [
-        'numpy',
-        'pandas',
-        'pydantic',
-        'packaging',
-        'wrapt',
-        ...localPythonPackages
+        ...PYODIDE_PACKAGES,
+        ...localPythonPackages.map(
+          (fileName) => self.name + 'pyodide/' + fileName
+        )
       ]
-    });
+    };
+    const start = performance.now();
+    const snapshot = await fetchPyodideSnapshot(
+      self.name + 'pyodide/',
+      version,
+      [...PYODIDE_PACKAGES, ...localPythonPackages],
+      importScript
+    );
+    let isRestored = false;
+    if (snapshot) {
+      try {
+        // packages are still loaded: their files are not in the snapshot,
+        // only the modules already imported. _loadSnapshot is private, the
+        // snapshot is only fetched for the pinned pyodide version
+        pyodide = await loadPyodide({ ...options, _loadSnapshot: snapshot });
+        isRestored = true;
+      } catch (error) {
+        console.warn('Pyodide snapshot could not be restored', error);
+      }
+    }
+    if (!isRestored) {
+      pyodide = await loadPyodide(options);
+    }
     const loadEnd = performance.now();
     postMessage({ loadTime: loadEnd - start });
-    await pyodide.runPython(importScript);
+    if (!isRestored) {
+      await pyodide.runPython(importScript);
+    }
     const importEnd = performance.now();
     postMessage({ importTime: importEnd - loadEnd });
   } catch (error) {
@@ -55,7 +77,9 @@ addEventListener(
     data: { task: Task; inputs: TaskInputs[Task]; id: string };
   }) => {
     if (pyodide) {
-      handleTask(pyodide, data.task, data.inputs).then((result) => {
+      const onProgress = (progress: unknown) =>
+        postMessage({ progress, id: data.id });
+      handleTask(pyodide, data.task, data.inputs, onProgress).then((result) => {
         postMessage({
           ...result,
           id: data.id
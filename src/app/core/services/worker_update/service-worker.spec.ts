@@ -143,6 +143,24 @@ describe('Service Worker Functions', () => {
       expect(mockCache.addAll).toHaveBeenCalledWith([]);
     });
 
+    it('should cache the hashes of the installed files', async () => {
+      const assets = { '/index.html': { sha256: 'abc', size: 10 } };
+      mockFetch.mockResolvedValue({
+        json: jest.fn().mockResolvedValue({ ...mockManifest, assets })
+      });
+
+      await installApp();
+
+      expect(mockCache.put).toHaveBeenCalledWith(
+        'asset-hashes',
+        expect.objectContaining({ headers: expect.anything() })
+      );
+      const response = mockCache.put.mock.calls.find(
+        ([key]) => key === 'asset-hashes'
+      )[1];
+      expect(await response.json()).toBe(JSON.stringify(assets));
+    });
+
     it('should handle fetch manifest errors', async () => {
       mockFetch.mockRejectedValue(new Error('Network error'));
 
@@ -198,6 +216,51 @@ describe('Service Worker Functions', () => {
       expect(mockCache.add).not.toHaveBeenCalledWith('/pyodide/file1.py');
     });
 
+    it('should skip cached files whose sha256 did not change', async () => {
+      mockFetch.mockResolvedValue({
+        json: jest.fn().mockResolvedValue({
+          ...mockManifest,
+          assets: {
+            '/index.html': { sha256: 'same', size: 10 },
+            '/app.js': { sha256: 'new', size: 20 }
+          }
+        })
+      });
+      mockCache.match.mockImplementation((key: string) =>
+        Promise.resolve(
+          key === 'asset-hashes'
+            ? new Response({
+                '/index.html': { sha256: 'same', size: 10 },
+                '/app.js': { sha256: 'old', size: 20 }
+              })
+            : new Response()
+        )
+      );
+      mockCache.keys.mockResolvedValue([
+        { url: 'https://example.com/index.html' },
+        { url: 'https://example.com/asset-hashes' }
+      ]);
+
+      await updateApp();
+
+      expect(mockCache.add).not.toHaveBeenCalledWith('/index.html');
+      expect(mockCache.add).toHaveBeenCalledWith('/app.js');
+      expect(mockCache.delete).not.toHaveBeenCalledWith('/asset-hashes');
+    });
+
+    it('should delete the /assets key of older service workers', async () => {
+      mockCache.match.mockResolvedValue(null);
+      mockCache.keys.mockResolvedValue([
+        { url: 'https://example.com/assets' },
+        { url: 'https://example.com/asset-hashes' }
+      ]);
+
+      await updateApp();
+
+      expect(mockCache.delete).toHaveBeenCalledWith('/assets');
+      expect(mockCache.delete).not.toHaveBeenCalledWith('/asset-hashes');
+    });
+
     it('should delete old files not in new manifest', async () => {
       mockCache.match.mockResolvedValue(null);
 
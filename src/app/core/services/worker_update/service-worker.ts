@@ -1,4 +1,14 @@
 const CACHE_NAME = 'app-assets';
+// sha256 and size of the cached files, from the assets list they come from,
+// under a key that no file of the app can have (e.g. under /assets/)
+const ASSETS_KEY = 'asset-hashes';
+
+interface Asset {
+  sha256: string;
+  size: number;
+}
+
+type Assets = Record<string, Asset>;
 
 function fetchLatestManifest() {
   return fetch('/assets_list.json');
@@ -19,6 +29,19 @@ export async function checkIfAppInstalled() {
   return false;
 }
 
+function jsonResponse(body: unknown) {
+  return new Response(JSON.stringify(body), {
+    headers: {
+      'content-type': 'application/json'
+    }
+  });
+}
+
+async function getCachedAssets(cache: Cache): Promise<Assets> {
+  const response = await cache.match(ASSETS_KEY);
+  return ((await response?.json()) as Assets | undefined) ?? {};
+}
+
 export async function installApp() {
   log('beginning app installation');
   const latestManifest = await fetchLatestManifest();
@@ -28,6 +51,7 @@ export async function installApp() {
   const buildVersion = manifest.app_version;
   const cache = await caches.open(CACHE_NAME);
   await cache.addAll(filesToInstall);
+  await cache.put(ASSETS_KEY, jsonResponse(manifest.assets ?? {}));
   cache.put(
     'app_version',
     new Response(JSON.stringify(buildVersion), {
@@ -59,9 +83,16 @@ export async function updateApp() {
   );
   log('updating service worker with manifest', manifest);
   const files = manifest.files || [];
+  const assets: Assets = manifest.assets ?? {};
   const cache = await caches.open(CACHE_NAME);
+  const cachedAssets = await getCachedAssets(cache);
   for (const file of files) {
-    if (file.startsWith('/pyodide')) {
+    // files listed with a sha256 are kept while it does not change, pyodide
+    // files of older assets lists while their path does not change
+    const isUnchanged = assets[file]
+      ? cachedAssets[file]?.sha256 === assets[file].sha256
+      : file.startsWith('/pyodide');
+    if (isUnchanged) {
       if (await cache.match(file)) {
         log('file already in cache, skipping', file);
       } else {
@@ -77,13 +108,15 @@ export async function updateApp() {
     key.url.replace(self.location.origin, '')
   );
   const keysToDelete = cacheKeys.filter(
-    (key) => key !== '/app_version' && !files.includes(key)
+    (key) =>
+      key !== '/app_version' && key !== '/' + ASSETS_KEY && !files.includes(key)
   );
   for (const key of keysToDelete) {
     log('deleting file', key);
     await cache.delete(key);
   }
   const appVersion = manifest.app_version;
+  await cache.put(ASSETS_KEY, jsonResponse(assets));
   await cache.put(
     'app_version',
     new Response(JSON.stringify(appVersion), {